@@ -9,28 +9,88 @@ Architecture:
 - Existing frontend integration
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import asyncio
+import atexit
+import hmac
+import httpx
+import orjson
+import threading
 import time
-import json
+import logging
+import logging.handlers
 import os
-from typing import Dict, Any
+import queue
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Iterator, List, Tuple
+from urllib.parse import quote
+from cachetools import LRUCache, TTLCache, cached
 from dotenv import load_dotenv
 
 # Load .env file (API keys)
 load_dotenv()
 
 # Import custom modules
-from groq_client import GroqClient
+from groq_client import GroqClient, ASYNC_LIMITS
 from ollama_client import OllamaClient
-from prompt_templates import build_structure_prompt, build_subject_detail_prompt
+from prompt_templates import build_structure_prompt, build_subject_detail_prompt, build_batch_subject_detail_prompt
 from curriculum_engine import CurriculumEngine
 from pdf_generator import PDFGenerator
+from semantic_cache import SemanticCache
+from llm_pool import LLMClientPool
+from batching_queue import BatchingLLMQueue
+
+log = logging.getLogger(__name__)
+
+# Request threads only enqueue log records; a background listener does the
+# formatting and stdout I/O, so handlers never serialize on the stdout lock
+if __name__ != '__mp_main__':  # PDF pool workers started via spawn re-import this module
+    _log_queue = queue.Queue(-1)
+    logging.basicConfig(
+        level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s %(levelname)s %(message)s',
+        handlers=[logging.handlers.QueueHandler(_log_queue)]
+    )
+    _log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(), respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (jsonify, request.get_json)."""
+    
+    def _options(self) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Skip the str round-trip: orjson already produces the bytes to send
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._options()),
+            mimetype=self.mimetype
+        )
+
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+app.secret_key = os.environ.get('FLASK_SECRET_KEY') or os.urandom(32)
 CORS(app)
 
+# Required in the X-Admin-Token header by /admin/* routes; unset disables them
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
 # Initialize components
 # PRIORITY: Groq (fast cloud, FREE) -> Ollama (local fallback)
 groq_client = GroqClient()  # 1-3 seconds, FREE
@@ -38,33 +98,316 @@ ollama_client = OllamaClient(model="qwen2.5:1.5b")  # Fallback if no internet/AP
 curriculum_engine = CurriculumEngine()
 pdf_generator = PDFGenerator()
 
+# Idle Groq connections are pinged this often (seconds) to stay warm
+GROQ_KEEPALIVE_INTERVAL = 240
+
+# Groq first, then Ollama; after 3 consecutive failures a client is skipped for 30s
+llm_pool = LLMClientPool([groq_client, ollama_client], fail_threshold=3, reset_after=30.0)
+
 # In-memory cache for generated content
-subject_cache = {}
-current_structure = {}
+# Subject syllabi are memoized by (program, subject) and survive structure
+# regenerations; LRU eviction keeps memory bounded
+SUBJECT_CACHE_SIZE = 512
+subject_cache = LRUCache(maxsize=SUBJECT_CACHE_SIZE)
+
+# Per-session state (current curriculum), keyed by a session id cookie so
+# concurrent users never see or download each other's structure
+SESSION_TTL = 3600
+session_state = TTLCache(maxsize=1000, ttl=SESSION_TTL)
+session_lock = threading.Lock()
+
+# Near-duplicate requests ("Intro to ML" vs "Introduction to ML") reuse earlier output
+semantic_cache = SemanticCache(
+    threshold=0.92,
+    path=os.environ.get('SEMANTIC_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.semantic_cache.json'))
+)
+if __name__ != '__mp_main__':  # PDF pool workers started via spawn re-import this module
+    atexit.register(semantic_cache.save)
+
+# Subject syllabi are Markdown; larger token limits prevent abrupt cutoffs
+SUBJECT_DETAIL_OPTIONS = {'max_tokens': 2048, 'num_predict': 2048}
+
+# Max concurrent LLM calls per batch (stays under Groq free-tier rate limits)
+MAX_CONCURRENT_GENERATIONS = 10
+
+# Background prefetch: syllabi are generated right after the structure so
+# subject clicks hit the cache instead of paying a full LLM round-trip
+PREFETCH_WORKERS = 8
+PREFETCH_WAIT_TIMEOUT = 60  # Max seconds a click waits on an in-flight prefetch
+prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='prefetch')
+prefetch_inflight: Dict[Tuple[str, str], Future] = {}
+cache_lock = threading.Lock()
 
+# Prefetched syllabi arriving within 50ms are generated together in one LLM call;
+# 4 x 2048 tokens stays within the model's output limit
+SUBJECT_BATCH_SIZE = 4
+SUBJECT_BATCH_WAIT_MS = 50
 
-def smart_generate(prompt: str, options: dict = None, json_mode: bool = True) -> Dict[str, Any]:
+
+class GenerationError(RuntimeError):
+    """Raised when neither Groq nor Ollama produced a response."""
+
+
+def _session_id() -> str:
+    """Return this browser session's id, assigning one on first use."""
+    sid = session.get('sid')
+    if not sid:
+        sid = uuid.uuid4().hex
+        session['sid'] = sid
+    return sid
+
+
+def get_current_structure() -> Dict[str, Any]:
+    """Curriculum most recently generated in this session (empty if none)."""
+    sid = _session_id()
+    with session_lock:
+        return session_state.get(sid, {}).get('structure', {})
+
+
+def set_current_structure(structure: Dict[str, Any]) -> None:
+    """Store the curriculum for this session."""
+    sid = _session_id()
+    with session_lock:
+        session_state[sid] = {'structure': structure}
+
+
+def _semantic_lookup(semantic_key: Tuple[str, str]) -> Dict[str, Any]:
+    """Return a cached result for a semantically similar request, or None."""
+    scope, text = semantic_key
+    cached_result = semantic_cache.get(text, scope=scope)
+    if cached_result is None:
+        return None
+    
+    log.info("🧠 Semantic cache HIT for: %s", text)
+    return {**cached_result, 'generation_time': 0.001, 'cached': True}
+
+
+def _semantic_store(semantic_key: Tuple[str, str], result: Dict[str, Any]) -> None:
+    """Remember a successful result for future similar requests."""
+    if result['success']:
+        scope, text = semantic_key
+        semantic_cache.put(text, {
+            'response': result['response'],
+            'model': result['model'],
+            'success': True
+        }, scope=scope)
+
+
+def smart_generate(prompt: str, options: dict = None, json_mode: bool = True,
+                   semantic_key: Tuple[str, str] = None) -> Dict[str, Any]:
     """
     Smart generation: tries Groq first, falls back to Ollama.
     Returns dict with 'response', 'generation_time', 'model', 'success'.
+    
+    semantic_key: (scope, short description) of the request (not the prompt);
+                  enables the semantic cache for near-duplicate descriptions
+                  within the exact same scope.
     """
-    # Try Groq first (fast cloud)
-    if groq_client.is_available():
-        print(f"⚡ Using Groq ({groq_client.model})...")
-        result = groq_client.generate(prompt, options, json_mode=json_mode)
-        if result['success']:
-            print(f"✅ Groq responded in {result['generation_time']}s")
-            return result
-        else:
-            print(f"⚠️ Groq failed: {result.get('error')}. Falling back to Ollama...")
-    else:
-        print("⚠️ No GROQ_API_KEY set. Using Ollama (local)...")
+    if semantic_key:
+        cached_result = _semantic_lookup(semantic_key)
+        if cached_result:
+            return cached_result
     
-    # Fallback to Ollama
-    print(f"🔄 Using Ollama ({ollama_client.model})...")
-    result = ollama_client.generate(prompt, options)
+    result = llm_pool.generate(prompt, options, json_mode=json_mode)
+    if result['success']:
+        log.info("✅ %s responded in %.2fs", result['model'], result['generation_time'])
+    if semantic_key:
+        _semantic_store(semantic_key, result)
     return result
 
+
+def _parsed_response(result: Dict[str, Any]) -> Any:
+    """JSON object of a successful result, reusing the client's parse when it did one."""
+    parsed = result.get('parsed')
+    if isinstance(parsed, dict):
+        return parsed
+    return curriculum_engine.parse_ai_response(result['response'])
+
+
+def _subject_key(program: str, subject: str) -> Tuple[str, str]:
+    """Cache key for a subject syllabus."""
+    return (program, subject)
+
+
+def _subject_semantic_key(program: str, subject: str) -> Tuple[str, str]:
+    """
+    Semantic-cache key for a subject syllabus: only the subject name is
+    matched by similarity, the program must match exactly.
+    """
+    return (program, subject)
+
+
+def _generate_subject_details_batched(items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Generate syllabi for a batch of (program, subject) pairs.
+    Subjects of the same program share one LLM call that returns a JSON object
+    mapping subject -> Markdown; any subject missing from it is generated alone.
+    
+    Only Groq batches: the combined output budget (several x 2048 tokens) does
+    not fit Ollama's context window, so when Groq is unhealthy or fails every
+    subject is generated alone rather than truncated and then regenerated anyway.
+    """
+    by_program: Dict[str, List[str]] = {}
+    for program, subject in items:
+        by_program.setdefault(program, []).append(subject)
+    
+    results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for program, subjects in by_program.items():
+        if len(subjects) > 1:
+            log.info("📦 Generating %s syllabi in one call...", len(subjects))
+            options = {key: value * len(subjects) for key, value in SUBJECT_DETAIL_OPTIONS.items()}
+            batch_result = llm_pool.generate(
+                build_batch_subject_detail_prompt(subjects, program),
+                options=options,
+                json_mode=True,
+                clients=[groq_client]
+            )
+            parsed = _parsed_response(batch_result) if batch_result['success'] else None
+            
+            for subject in subjects:
+                markdown = parsed.get(subject) if isinstance(parsed, dict) else None
+                if isinstance(markdown, str) and markdown.strip():
+                    result = {**batch_result, 'response': markdown}
+                    result.pop('parsed', None)
+                    results[(program, subject)] = result
+        
+        for subject in subjects:
+            if (program, subject) not in results:
+                results[(program, subject)] = smart_generate(
+                    build_subject_detail_prompt(subject, program),
+                    options=SUBJECT_DETAIL_OPTIONS,
+                    json_mode=False
+                )
+    
+    return [results[item] for item in items]
+
+
+subject_batcher = BatchingLLMQueue(
+    _generate_subject_details_batched,
+    max_batch=SUBJECT_BATCH_SIZE,
+    max_wait_ms=SUBJECT_BATCH_WAIT_MS
+)
+
+
+@cached(cache=subject_cache, key=_subject_key, lock=cache_lock, info=True)
+def _generate_subject_detail(program: str, subject: str) -> str:
+    """
+    Generate (memoized) Markdown syllabus for a subject, batched with any
+    other subjects requested at the same time.
+    Failures raise GenerationError so they are never cached.
+    """
+    semantic_key = _subject_semantic_key(program, subject)
+    result = _semantic_lookup(semantic_key)
+    if result is None:
+        result = subject_batcher.add((program, subject)).result()
+        _semantic_store(semantic_key, result)
+    
+    if not result['success']:
+        raise GenerationError(result.get('error', 'Generation failed'))
+    
+    log.info("✅ Generated %s in %.2fs", subject, result['generation_time'])
+    return result['response']
+
+
+def _prefetch_subject(program: str, subject: str) -> str:
+    """Generate one subject syllabus in the background (populates the cache)."""
+    cache_key = _subject_key(program, subject)
+    try:
+        return _generate_subject_detail(program, subject)
+    finally:
+        with cache_lock:
+            prefetch_inflight.pop(cache_key, None)
+
+
+def prefetch_subject_details(curriculum: Dict[str, Any]) -> None:
+    """Queue background generation for every uncached subject in the curriculum."""
+    program = curriculum.get('program')
+    if not program:
+        return
+    
+    with cache_lock:
+        for sem in curriculum.get('semesters', []):
+            for subj in sem.get('subjects', []):
+                subject = subj.get('name')
+                cache_key = _subject_key(program, subject)
+                if not subject or cache_key in subject_cache or cache_key in prefetch_inflight:
+                    continue
+                prefetch_inflight[cache_key] = prefetch_executor.submit(_prefetch_subject, program, subject)
+    
+    log.info("🔮 Prefetching %s syllabi in background...", len(prefetch_inflight))
+
+
+def smart_generate_stream(prompt: str, options: dict = None, json_mode: bool = True,
+                          stream_info: Dict[str, Any] = None) -> Iterator[str]:
+    """
+    Streaming smart generation: yields text chunks as they arrive.
+    Falls back to Ollama if Groq fails before producing any output.
+    
+    stream_info: Optional dict that receives the 'model' that produced the stream.
+    """
+    yield from llm_pool.generate_stream(prompt, options, json_mode=json_mode, stream_info=stream_info)
+
+
+async def smart_generate_async(prompt: str, options: dict = None, json_mode: bool = True,
+                               client: httpx.AsyncClient = None,
+                               semantic_key: Tuple[str, str] = None) -> Dict[str, Any]:
+    """
+    Async version of smart_generate for concurrent fan-out.
+    Pass a shared httpx.AsyncClient so all calls in a batch reuse its connection pool.
+    """
+    if semantic_key:
+        cached_result = _semantic_lookup(semantic_key)
+        if cached_result:
+            return cached_result
+    
+    result = await llm_pool.agenerate(prompt, options, json_mode=json_mode, client=client)
+    
+    if semantic_key:
+        _semantic_store(semantic_key, result)
+    return result
+
+
+async def generate_subject_details_batch(subjects: List[str], program: str) -> List[Dict[str, Any]]:
+    """Generate syllabi for many subjects concurrently (bounded by a semaphore)."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+    
+    async with httpx.AsyncClient(http2=True, timeout=groq_client.timeout, limits=ASYNC_LIMITS) as client:
+        async def _bounded(subject: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await smart_generate_async(
+                    build_subject_detail_prompt(subject, program),
+                    options=SUBJECT_DETAIL_OPTIONS,
+                    json_mode=False,
+                    client=client,
+                    semantic_key=_subject_semantic_key(program, subject)
+                )
+        
+        return await asyncio.gather(*[_bounded(s) for s in subjects])
+
+def _warm_up_ollama() -> None:
+    """Load the Ollama model into memory if the server has it."""
+    health = ollama_client.health_check()
+    if health['ollama_connected'] and health['model_available']:
+        ollama_client.warm_up()
+
+
+def _warm_up_groq() -> None:
+    """Warm the Groq connection and prompt cache, then keep them warm while idle."""
+    groq_client.warm_up()
+    groq_client.start_keepalive(GROQ_KEEPALIVE_INTERVAL)
+
+
+def warm_up_engines() -> None:
+    """
+    Warm Groq and Ollama concurrently in the background (does not block).
+    Ollama is warmed even when Groq is primary so the fallback is ready too.
+    """
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='warmup')
+    if groq_client.is_available():
+        executor.submit(_warm_up_groq)
+    executor.submit(_warm_up_ollama)
+    executor.shutdown(wait=False)
+
 # ═══════════════════════════════════════════════════════════════════════════
 # ROUTES - Frontend Integration
 # ═══════════════════════════════════════════════════════════════════════════
@@ -99,16 +442,14 @@ def generate_structure():
                                  error="Program name is required", 
                                  nav_data=None)
         
-        # Clear cache for new generation
-        global subject_cache, current_structure
-        subject_cache = {}
-        current_structure = {}
+        # Clear previous structure (subject syllabi stay cached per program)
+        set_current_structure({})
         
         # Pre-calculate structure (saves 5-10 seconds vs asking AI)
         structure_info = curriculum_engine.calculate_structure(semesters, hours)
         
-        print(f"⚡ Generating curriculum for: {program}")
-        print(f"📊 Structure: {structure_info}")
+        log.info("⚡ Generating curriculum for: %s", program)
+        log.info("📊 Structure: %s", structure_info)
         
         # Build optimized prompt
         prompt = build_structure_prompt(
@@ -120,18 +461,18 @@ def generate_structure():
         )
         
         # Generate with smart fallback (Groq -> Ollama)
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = smart_generate(prompt)
-        print(f"📊 Result: success={result.get('success')}, time={result.get('generation_time')}s")
+        log.info("📊 Result: success=%s, time=%.2fs", result.get('success'), result.get('generation_time'))
         
         if not result['success']:
-            print(f"❌ Generation failed: {result.get('error')}")
+            log.error("❌ Generation failed: %s", result.get('error'))
             return render_template('result.html',
                                  error=f"Generation failed: {result.get('error', 'Unknown error')}",
                                  nav_data=None)
         
         # Parse AI response
-        curriculum_data = curriculum_engine.parse_ai_response(result['response'])
+        curriculum_data = _parsed_response(result)
         
         if not curriculum_data:
             return render_template('result.html',
@@ -143,29 +484,116 @@ def generate_structure():
             # Try to fix common issues
             curriculum_data = curriculum_engine.ensure_minimum_quality(curriculum_data)
         
-        # Store globally
-        current_structure = curriculum_data
+        # Store for this session
+        set_current_structure(curriculum_data)
+        
+        # Warm the subject cache before the user starts clicking
+        prefetch_subject_details(curriculum_data)
         
-        elapsed = time.time() - start_time
-        print(f"✅ Generation completed in {elapsed:.2f}s")
+        elapsed = time.perf_counter() - start_time
+        log.info("✅ Generation completed in %.2fs", elapsed)
         
         return render_template('result.html', nav_data=curriculum_data)
         
     except Exception as e:
-        print(f"❌ Error in generate_structure: {str(e)}")
+        log.error("❌ Error in generate_structure: %s", e)
         return render_template('result.html',
                              error=f"An error occurred: {str(e)}",
                              nav_data=None)
 
 
+def _sse(event: Dict[str, Any]) -> bytes:
+    """Format one server-sent event."""
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+def _stream_subject_detail(program: str, subject: str, prefetch: Future = None) -> Iterator[bytes]:
+    """
+    Server-sent events for a subject syllabus: a 'token' event per chunk as it
+    is generated, then a 'done' event (or an 'error' event).
+    The full text is cached once the stream completes.
+    """
+    cache_key = _subject_key(program, subject)
+    semantic_key = _subject_semantic_key(program, subject)
+    start_time = time.perf_counter()
+    content = None
+    source = 'prefetch'
+    
+    # Reuse an in-flight background prefetch instead of firing a duplicate call
+    if prefetch is not None:
+        log.info("⏳ Waiting on prefetch for: %s", subject)
+        try:
+            content = prefetch.result(timeout=PREFETCH_WAIT_TIMEOUT)
+        except FutureTimeoutError:
+            log.warning("⚠️ Prefetch timed out for: %s", subject)
+        except GenerationError as e:
+            log.warning("⚠️ Prefetch failed for %s: %s", subject, e)
+        except Exception as e:
+            # e.g. a malformed batch reply; the live stream below still answers
+            log.error("❌ Prefetch crashed for %s: %r", subject, e)
+    
+    if content is None:
+        cached_result = _semantic_lookup(semantic_key)
+        if cached_result:
+            content = cached_result['response']
+            source = 'semantic'
+            with cache_lock:
+                subject_cache[cache_key] = content
+    
+    # Nothing is generated for this request, so report it as cached
+    if content is not None:
+        yield _sse({"token": content})
+        yield _sse({"done": True, "cached": True, "source": source,
+                    "generation_time": round(time.perf_counter() - start_time, 2)})
+        return
+    
+    log.info("⚡ Cache MISS for: %s. Streaming...", subject)
+    chunks = []
+    stream_info = {}
+    completed = False
+    try:
+        for chunk in smart_generate_stream(
+            build_subject_detail_prompt(subject, program),
+            options=SUBJECT_DETAIL_OPTIONS,
+            json_mode=False,
+            stream_info=stream_info
+        ):
+            chunks.append(chunk)
+            yield _sse({"token": chunk})
+        completed = bool(chunks)
+        if not completed:
+            yield _sse({"error": "Empty response from model"})
+    except Exception as e:
+        log.error("❌ Streaming failed for %s: %s", subject, e)
+        yield _sse({"error": str(e)})
+    finally:
+        # Only complete syllabi are cached (not ones cut short by errors or disconnects)
+        if completed:
+            content = ''.join(chunks)
+            with cache_lock:
+                subject_cache[cache_key] = content
+            _semantic_store(semantic_key, {'response': content, 'model': stream_info.get('model'), 'success': True})
+    
+    if completed:
+        elapsed = time.perf_counter() - start_time
+        log.info("✅ Streamed %s in %.2fs", subject, elapsed)
+        yield _sse({"done": True, "cached": False, "generation_time": round(elapsed, 2)})
+
+
 @app.route('/generate_subject_details', methods=['POST'])
 def generate_subject_details():
     """
-    Generate detailed syllabus for a subject (with caching).
+    Stream detailed syllabus for a subject (with caching) as server-sent events.
     
     Expected JSON:
     - subject: Subject name
     - program: Program name
+    
+    Events (JSON in each 'data:' line):
+    - {"token": "..."}: next chunk of Markdown
+    - {"done": true, "cached": bool, "generation_time": float}; answers not
+      generated live also carry "source": "prefetch" or "semantic"
+    - {"error": "..."}
     """
     try:
         data = request.get_json()
@@ -176,51 +604,96 @@ def generate_subject_details():
             return jsonify({"error": "Missing subject or program"}), 400
         
         # Check cache
-        cache_key = f"{program}_{subject}"
-        print(f"🔍 Checking cache for: {cache_key}")
-        print(f"📦 Cache keys: {list(subject_cache.keys())}")
+        cache_key = _subject_key(program, subject)
+        log.info("🔍 Checking cache for: %s", cache_key)
         
-        if cache_key in subject_cache:
-            print(f"✅ Cache HIT for: {subject}")
-            return jsonify({
-                "content": subject_cache[cache_key],
-                "cached": True
-            })
+        with cache_lock:
+            content = subject_cache.get(cache_key)
+            prefetch = prefetch_inflight.get(cache_key)
         
-        print(f"⚡ Cache MISS for: {subject}. Generating...")
+        if content is not None:
+            log.info("✅ Cache HIT for: %s", subject)
+            events = iter([_sse({"token": content}), _sse({"done": True, "cached": True})])
+        else:
+            events = _stream_subject_detail(program, subject, prefetch)
         
-        # Build optimized prompt
-        prompt = build_subject_detail_prompt(subject, program)
-        
-        # Generate with smart fallback (Groq -> Ollama) — Markdown mode for syllabus
-        # Increased token limits to prevent abrupt cutoffs
-        result = smart_generate(
-            prompt,
-            options={'max_tokens': 2048, 'num_predict': 2048},
-            json_mode=False
+        return Response(
+            stream_with_context(events),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
         )
         
-        if not result['success']:
-            return jsonify({"error": result.get('error', 'Generation failed')}), 500
-        
-        content = result['response']
-        
-        # Cache the result
-        subject_cache[cache_key] = content
-        
-        print(f"✅ Generated in {result['generation_time']}s")
+    except Exception as e:
+        log.error("❌ Error in generate_subject_details: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/generate_all_subject_details', methods=['POST'])
+async def generate_all_subject_details():
+    """
+    Generate syllabi for many subjects concurrently (with caching).
+    
+    Expected JSON:
+    - program: Program name
+    - subjects: List of subject names (defaults to every subject in the current structure)
+    """
+    try:
+        data = request.get_json()
+        program = data.get('program')
+        subjects = data.get('subjects')
+        
+        current_structure = get_current_structure()
+        if not subjects and current_structure.get('program') == program:
+            subjects = [subj['name']
+                        for sem in current_structure.get('semesters', [])
+                        for subj in sem.get('subjects', [])]
+        
+        if not program or not subjects:
+            return jsonify({"error": "Missing subjects or program"}), 400
+        
+        details = {}
+        pending = []
+        with cache_lock:
+            for subject in subjects:
+                cache_key = _subject_key(program, subject)
+                if cache_key in subject_cache:
+                    details[subject] = subject_cache[cache_key]
+                elif subject not in pending:
+                    pending.append(subject)
+        
+        log.info("⚡ Generating %s syllabi concurrently (%s cached)...", len(pending), len(details))
+        start_time = time.perf_counter()
+        
+        results = await generate_subject_details_batch(pending, program)
+        
+        errors = {}
+        with cache_lock:
+            for subject, result in zip(pending, results):
+                if result['success']:
+                    subject_cache[_subject_key(program, subject)] = result['response']
+                    details[subject] = result['response']
+                else:
+                    errors[subject] = result.get('error', 'Generation failed')
+        
+        elapsed = time.perf_counter() - start_time
+        log.info("✅ Batch completed in %.2fs", elapsed)
         
         return jsonify({
-            "content": content,
-            "cached": False,
-            "generation_time": result['generation_time']
+            "details": details,
+            "errors": errors,
+            "generation_time": round(elapsed, 2)
         })
         
     except Exception as e:
-        print(f"❌ Error in generate_subject_details: {str(e)}")
+        log.error("❌ Error in generate_all_subject_details: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
+def _attachment_headers(filename: str) -> Dict[str, str]:
+    """Content-Disposition header for a download (RFC 6266, safe for non-ASCII names)."""
+    return {'Content-Disposition': f"attachment; filename*=UTF-8''{quote(filename)}"}
+
+
 @app.route('/download_pdf')
 def download_pdf():
     """
@@ -228,32 +701,31 @@ def download_pdf():
     Target: <2 seconds generation time
     """
     try:
-        global current_structure
+        current_structure = get_current_structure()
         
         if not current_structure:
             return "No curriculum found. Please generate one first.", 400
         
-        print("📄 Generating PDF...")
-        start_time = time.time()
+        log.info("📄 Generating PDF...")
+        start_time = time.perf_counter()
         
         # Generate PDF
-        pdf_buffer = pdf_generator.generate_pdf(current_structure)
+        pdf_chunks = pdf_generator.generate_pdf_stream(current_structure)
         
-        elapsed = time.time() - start_time
-        print(f"✅ PDF generated in {elapsed:.2f}s")
+        elapsed = time.perf_counter() - start_time
+        log.info("✅ PDF generated in %.2fs", elapsed)
         
         program_name = current_structure.get('program', 'curriculum')
         filename = f"{program_name.replace(' ', '_')}_curriculum.pdf"
         
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+        return Response(
+            stream_with_context(pdf_chunks),
+            mimetype='application/pdf',
+            headers=_attachment_headers(filename)
         )
         
     except Exception as e:
-        print(f"❌ Error in download_pdf: {str(e)}")
+        log.error("❌ Error in download_pdf: %s", e)
         return f"PDF generation failed: {str(e)}", 500
 
 
@@ -270,26 +742,25 @@ def download_course_pdf():
         if not subject or not content:
             return jsonify({"error": "Missing subject or content"}), 400
         
-        print(f"📄 Generating course PDF for: {subject}")
-        start_time = time.time()
+        log.info("📄 Generating course PDF for: %s", subject)
+        start_time = time.perf_counter()
         
         # Generate PDF for single course
-        pdf_buffer = pdf_generator.generate_course_pdf(subject, content)
+        pdf_chunks = pdf_generator.generate_course_pdf_stream(subject, content)
         
-        elapsed = time.time() - start_time
-        print(f"✅ Course PDF generated in {elapsed:.2f}s")
+        elapsed = time.perf_counter() - start_time
+        log.info("✅ Course PDF generated in %.2fs", elapsed)
         
         filename = f"{subject.replace(' ', '_')}_syllabus.pdf"
         
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+        return Response(
+            stream_with_context(pdf_chunks),
+            mimetype='application/pdf',
+            headers=_attachment_headers(filename)
         )
         
     except Exception as e:
-        print(f"❌ Error in download_course_pdf: {str(e)}")
+        log.error("❌ Error in download_course_pdf: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -334,7 +805,7 @@ def api_generate_curriculum():
             }), 400
         
         # Generate curriculum
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         prompt = build_structure_prompt(skill, level, semesters, hours, industry)
         result = smart_generate(prompt)
@@ -345,7 +816,7 @@ def api_generate_curriculum():
                 "message": result.get('error', 'Generation failed')
             }), 500
         
-        curriculum_data = curriculum_engine.parse_ai_response(result['response'])
+        curriculum_data = _parsed_response(result)
         
         if not curriculum_data:
             return jsonify({
@@ -355,7 +826,7 @@ def api_generate_curriculum():
         
         curriculum_data = curriculum_engine.ensure_minimum_quality(curriculum_data)
         
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
         
         return jsonify({
             "status": "success",
@@ -370,6 +841,32 @@ def api_generate_curriculum():
         }), 500
 
 
+def _admin_authorized() -> bool:
+    """Whether the request carries the configured admin token."""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+@app.route('/admin/clear_cache', methods=['POST'])
+def clear_cache():
+    """Invalidate all memoized subject syllabi and cached LLM responses (requires ADMIN_TOKEN)."""
+    if not _admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    
+    info = _generate_subject_detail.cache_info()
+    _generate_subject_detail.cache_clear()
+    llm_entries = groq_client.clear_cache() + ollama_client.clear_cache()
+    log.info("🧹 Caches cleared (%s subjects, %s LLM responses)", info.currsize, llm_entries)
+    
+    return jsonify({
+        "status": "cleared",
+        "entries": info.currsize,
+        "llm_entries": llm_entries,
+        "hits": info.hits,
+        "misses": info.misses
+    })
+
+
 @app.route('/health')
 def health_check():
     """Health check endpoint."""
@@ -411,12 +908,8 @@ if __name__ == '__main__':
     health = ollama_client.health_check()
     if health['ollama_connected']:
         print(f"✅ Ollama connected (fallback: {ollama_client.model})")
-        if not groq_client.is_available():
-            # Only warm up Ollama if it's the primary engine
-            if health['model_available']:
-                ollama_client.warm_up()
-            else:
-                print(f"   ⚠️ Model '{ollama_client.model}' not found. Run: ollama pull {ollama_client.model}")
+        if not health['model_available']:
+            print(f"   ⚠️ Model '{ollama_client.model}' not found. Run: ollama pull {ollama_client.model}")
     else:
         if not groq_client.is_available():
             print("❌ No AI engine available!")
@@ -425,4 +918,8 @@ if __name__ == '__main__':
     
     print("=" * 80)
     
-    app.run(debug=True, port=5000, threaded=True)
+    # Warm connections/models while the server starts accepting requests
+    warm_up_engines()
+    
+    # Development server only; in production run: gunicorn -c gunicorn_conf.py app:app
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=5000, threaded=True)
@@ -0,0 +1,81 @@
+"""
+Batching LLM Queue - Coalesce prompts that arrive together into one LLM call
+Prefetching a curriculum queues a dozen syllabi at once; sending them K at a
+time amortizes the per-call HTTP and prompt-preamble overhead across K subjects.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+
+class BatchingLLMQueue:
+    """Buffers items for up to max_wait_ms (or max_batch items), then runs them as one batch."""
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch: int = 4,
+                 max_wait_ms: float = 50, max_inflight_batches: int = 4):
+        """
+        Initialize batching queue.
+
+        Args:
+            run_batch: Called with a list of items; returns one result per item, in order
+                       (an Exception in the list fails only that item's future)
+            max_batch: Most items sent in one call
+            max_wait_ms: How long the first item waits for others to join its batch
+            max_inflight_batches: Batches that may run concurrently
+        """
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight_batches, thread_name_prefix='llm-batch')
+        self._collector = None
+        self._lock = threading.Lock()
+
+    def add(self, item: Any) -> Future:
+        """Queue an item; the returned future resolves with its result."""
+        future = Future()
+        self._queue.put((item, future))
+
+        # Started on first use so importing modules never spawns threads
+        with self._lock:
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, name='llm-batch-collector', daemon=True)
+                self._collector.start()
+
+        return future
+
+    def _collect(self) -> None:
+        """Group queued items into batches and hand each batch to the executor."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[Tuple[Any, Future]]) -> None:
+        """Run one batch and resolve its futures."""
+        items = [item for item, _ in batch]
+        try:
+            results = self.run_batch(items)
+        except Exception as e:
+            results = [e] * len(batch)
+        if len(results) != len(batch):
+            results = [RuntimeError("Batch returned the wrong number of results")] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,191 @@
+"""
+Response Cache - Exact-match cache for LLM calls (memory + disk)
+Identical requests (same model, prompt and options) skip the HTTP round-trip
+entirely: hits come from an in-process LRU, then from a disk cache that
+survives restarts (demo replays, regenerating the same curriculum).
+Setting CURRICULUM_CACHE_REDIS_URL swaps the disk tier for Redis, so hits are
+shared across machines (CI runs, several app hosts) rather than one host.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+from cachetools import LRUCache
+
+log = logging.getLogger(__name__)
+
+# Shared by every ResponseCache; override with CURRICULUM_CACHE_DIR
+DEFAULT_CACHE_DIR = os.environ.get('CURRICULUM_CACHE_DIR', os.path.expanduser('~/.curriculum_cache'))
+DEFAULT_TTL = 7 * 24 * 3600  # 7 days
+# e.g. redis://localhost:6379/0; unset keeps the disk cache
+DEFAULT_REDIS_URL = os.environ.get('CURRICULUM_CACHE_REDIS_URL') or None
+
+# Characters that must be escaped in a Redis SCAN MATCH pattern
+_REDIS_GLOB_SPECIAL = re.compile(r'([*?\[\]\\])')
+
+_disk_caches: Dict[str, Any] = {}
+_disk_lock = threading.Lock()
+
+
+def _open_disk_cache(directory: str):
+    """Open (once per directory) the on-disk cache, or None if unavailable."""
+    with _disk_lock:
+        if directory not in _disk_caches:
+            try:
+                import diskcache
+                # Results are JSON; zlib level 1 shrinks them several-fold for
+                # little CPU (entries written by older pickle-based versions
+                # fail to decode, read as misses and are overwritten)
+                _disk_caches[directory] = diskcache.Cache(
+                    directory, disk=diskcache.JSONDisk, disk_compress_level=1
+                )
+            except Exception as e:
+                log.warning("⚠️ Disk cache unavailable (%s); using memory only", e)
+                _disk_caches[directory] = None
+        return _disk_caches[directory]
+
+
+class _RedisStore:
+    """Adapts a Redis connection to the get/set/iterkeys/delete calls used on diskcache."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.client.get(key)
+        return orjson.loads(data) if data is not None else None
+
+    def set(self, key: str, value: Dict[str, Any], expire: float) -> None:
+        self.client.set(key, orjson.dumps(value), ex=int(expire))
+
+    def iterkeys(self, prefix: str = ''):
+        # Filtered server-side: the Redis DB may be shared with other apps
+        pattern = _REDIS_GLOB_SPECIAL.sub(r'\\\1', prefix) + '*'
+        for key in self.client.scan_iter(match=pattern, count=1000):
+            yield key.decode() if isinstance(key, bytes) else key
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+
+def _open_redis(url: str):
+    """Connect (once per URL) to Redis, or None if the package or server is unavailable."""
+    with _disk_lock:
+        if url not in _disk_caches:
+            try:
+                import redis
+                client = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+                client.ping()
+                _disk_caches[url] = _RedisStore(client)
+            except Exception as e:
+                log.warning("⚠️ Redis cache unavailable (%s); falling back to disk cache", e)
+                _disk_caches[url] = None
+        return _disk_caches[url]
+
+
+class ResponseCache:
+    """Two-tier (LRU + disk) cache of successful LLM results."""
+
+    def __init__(self, namespace: str, maxsize: int = 512,
+                 directory: Optional[str] = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 enabled: bool = True, redis_url: Optional[str] = DEFAULT_REDIS_URL):
+        """
+        Initialize response cache.
+
+        Args:
+            namespace: Prefix that keeps different clients' keys apart on disk
+            maxsize: Entries kept in memory
+            directory: Disk cache location (None for memory only)
+            ttl: Seconds a disk entry stays valid
+            enabled: If False, get() always misses and set() stores nothing
+            redis_url: Redis to use instead of the disk cache (falls back to disk if unreachable)
+        """
+        self.namespace = namespace
+        self.directory = directory
+        self.ttl = ttl
+        self.enabled = enabled
+        self.redis_url = redis_url
+        self._memory = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Stable digest of a request payload (model, prompt and options)."""
+        data = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _disk(self):
+        # Opened on first use so importing a client never touches the filesystem or network
+        if self.redis_url:
+            store = _open_redis(self.redis_url)
+            if store is not None:
+                return store
+        return _open_disk_cache(self.directory) if self.directory else None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._memory.get(key)
+        if value is not None:
+            return value
+
+        disk = self._disk()
+        if disk is None:
+            return None
+        try:
+            value = disk.get(f"{self.namespace}:{key}")
+        except Exception:
+            return None
+
+        if value is not None:
+            with self._lock:
+                self._memory[key] = value
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in memory and on disk."""
+        if not self.enabled:
+            return
+        value = dict(value)  # Callers may go on to modify their copy
+        with self._lock:
+            self._memory[key] = value
+
+        disk = self._disk()
+        if disk is not None:
+            try:
+                disk.set(f"{self.namespace}:{key}", value, expire=self.ttl)
+            except Exception as e:
+                log.warning("⚠️ Could not write disk cache: %s", e)
+
+    def get_or_compute(self, key: str, fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached result for key, computing (and caching successes) on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = fn()
+            if value.get('success'):
+                self.set(key, value)
+        return value
+
+    def clear(self) -> int:
+        """Drop every entry (memory and this namespace on disk); returns entries removed."""
+        with self._lock:
+            removed = len(self._memory)
+            self._memory.clear()
+
+        disk = self._disk()
+        if disk is not None:
+            prefix = f"{self.namespace}:"
+            try:
+                keys = disk.iterkeys(prefix) if isinstance(disk, _RedisStore) else disk.iterkeys()
+                for disk_key in list(keys):
+                    if isinstance(disk_key, str) and disk_key.startswith(prefix):
+                        disk.delete(disk_key)
+            except Exception as e:
+                log.warning("⚠️ Could not clear disk cache: %s", e)
+        return removed
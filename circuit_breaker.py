@@ -0,0 +1,58 @@
+"""
+Circuit Breaker - Stop paying for a provider that keeps failing
+After repeated Groq failures, requests go straight to the fallback for a
+cooldown period instead of waiting on another doomed Groq call first.
+"""
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one probe through after a cooldown."""
+
+    def __init__(self, fail_threshold: int = 3, reset_after: float = 30.0):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            fail_threshold: Consecutive failures before the circuit opens
+            reset_after: Seconds to skip the provider before probing it again
+        """
+        self.fail_threshold = fail_threshold
+        self.reset_after = reset_after
+        self.fails = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """
+        Check whether calls should skip the provider.
+
+        Once the cooldown has passed, the circuit is half-open: the first caller
+        is let through as a probe and the cooldown is re-armed, so a probe that
+        never reports back cannot keep the circuit stuck.
+        """
+        with self._lock:
+            if self.fails < self.fail_threshold:
+                return False
+
+            now = time.monotonic()
+            if now < self.open_until:
+                return True
+
+            # Half-open: allow a single probe
+            self.open_until = now + self.reset_after
+            return False
+
+    def record_failure(self) -> None:
+        """Count a failure; opens the circuit once the threshold is reached."""
+        with self._lock:
+            self.fails += 1
+            if self.fails >= self.fail_threshold:
+                self.open_until = time.monotonic() + self.reset_after
+
+    def reset(self) -> None:
+        """Close the circuit after a success."""
+        with self._lock:
+            self.fails = 0
+            self.open_until = 0.0
@@ -2,10 +2,71 @@
 Curriculum Engine - Core Logic for Structure and Validation
 Pre-calculates structure to avoid asking AI (saves 5-10 seconds)
 """
-import json
+import fastjsonschema
+import orjson
 import re
 from typing import Dict, List, Any, Optional
 
+# Required curriculum shape; compiled once into a specialized validator function
+_CURRICULUM_SCHEMA = {
+    'type': 'object',
+    'required': ['program', 'semesters'],
+    'properties': {
+        'semesters': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['semester', 'subjects'],
+                'properties': {
+                    'subjects': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'required': ['name', 'code', 'credits', 'hours_per_week', 'description', 'topics']
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+_validate_curriculum = fastjsonschema.compile(_CURRICULUM_SCHEMA)
+
+# Bytes that matter when scanning for the end of a JSON object
+_JSON_TOKEN_RE = re.compile(rb'[{}"\\]')
+
+
+def _find_object_end(data: bytes, start: int) -> int:
+    """
+    Return the index of the '}' closing the object opened at data[start],
+    skipping braces inside strings. Returns -1 if the object is unterminated.
+    """
+    depth = 0
+    in_string = False
+    skip = -1  # Position of a byte escaped by a backslash
+    
+    for match in _JSON_TOKEN_RE.finditer(data, start):
+        pos = match.start()
+        if pos == skip:
+            continue
+        
+        char = data[pos]
+        if in_string:
+            if char == 0x5C:    # backslash
+                skip = pos + 1
+            elif char == 0x22:  # closing quote
+                in_string = False
+        elif char == 0x22:
+            in_string = True
+        elif char == 0x7B:      # {
+            depth += 1
+        elif char == 0x7D:      # }
+            depth -= 1
+            if depth == 0:
+                return pos
+    
+    return -1
+
 
 class CurriculumEngine:
     """Handles curriculum structure calculation and validation."""
@@ -42,7 +103,11 @@ class CurriculumEngine:
     @staticmethod
     def parse_ai_response(raw_response: str) -> Optional[Dict]:
         """
-        Parse JSON from AI response with aggressive cleaning.
+        Parse JSON from AI response in a single pass.
+        
+        Locates the first balanced {...} object (which naturally skips
+        markdown code fences and surrounding chatter) and parses just that
+        slice, without building cleaned copies of the response.
         
         Args:
             raw_response: Raw text from Ollama
@@ -50,23 +115,20 @@ class CurriculumEngine:
         Returns:
             Parsed JSON dict or None if parsing fails
         """
+        data = raw_response.encode()
+        
         try:
-            # Strip markdown code blocks
-            cleaned = re.sub(r'```(?:json)?', '', raw_response, flags=re.IGNORECASE)
-            cleaned = cleaned.replace('```', '').strip()
-            
             # Find JSON object
-            start = cleaned.find('{')
-            end = cleaned.rfind('}') + 1
+            start = data.find(b'{')
+            end = _find_object_end(data, start) if start != -1 else -1
             
-            if start != -1 and end > start:
-                json_str = cleaned[start:end]
-                return json.loads(json_str)
+            if end != -1:
+                return orjson.loads(memoryview(data)[start:end + 1])
             
             # Try parsing entire response
-            return json.loads(cleaned)
+            return orjson.loads(data)
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return None
     
     @staticmethod
@@ -81,49 +143,11 @@ class CurriculumEngine:
             True if valid, False otherwise
         """
         try:
-            # Check required top-level keys
-            if 'program' not in curriculum or 'semesters' not in curriculum:
-                return False
-            
-            # Check semesters is a list
-            if not isinstance(curriculum['semesters'], list):
-                return False
-            
-            # Validate each semester
-            for sem in curriculum['semesters']:
-                if 'semester' not in sem or 'subjects' not in sem:
-                    return False
-                
-                # Validate subjects
-                for subj in sem.get('subjects', []):
-                    required_keys = ['name', 'code', 'credits', 'hours_per_week', 'description', 'topics']
-                    if not all(key in subj for key in required_keys):
-                        return False
-            
+            _validate_curriculum(curriculum)
             return True
-            
-        except:
+        except fastjsonschema.JsonSchemaException:
             return False
     
-    @staticmethod
-    def fill_missing_topics(course: Dict) -> Dict:
-        """
-        Fill missing topics with placeholders if AI didn't generate them.
-        
-        Args:
-            course: Course dict
-            
-        Returns:
-            Course dict with topics filled
-        """
-        if 'topics' not in course or not course['topics']:
-            course['topics'] = [
-                f"{course.get('name', 'Course')} Fundamentals",
-                f"Advanced {course.get('name', 'Course')} Concepts"
-            ]
-        
-        return course
-    
     @staticmethod
     def ensure_minimum_quality(curriculum: Dict) -> Dict:
         """
@@ -135,9 +159,12 @@ class CurriculumEngine:
         Returns:
             Enhanced curriculum dict
         """
-        # Fill missing topics for all courses
-        for sem in curriculum.get('semesters', []):
-            for subj in sem.get('subjects', []):
-                CurriculumEngine.fill_missing_topics(subj)
+        # Fill missing topics for all courses in one pass; courses that
+        # already have topics cost a single lookup
+        for sem in curriculum.get('semesters', ()):
+            for subj in sem.get('subjects', ()):
+                if not subj.get('topics'):
+                    name = subj.get('name', 'Course')
+                    subj['topics'] = [f"{name} Fundamentals", f"Advanced {name} Concepts"]
         
         return curriculum
@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration - production server for the curriculum generator
+Run with: gunicorn -c gunicorn_conf.py app:app
+
+Uses threaded (gthread) workers rather than gevent: request handlers spend
+their time waiting on Groq/Ollama, which releases the GIL, and the app
+already relies on real threads (prefetch pool, log listener, batching queue)
+and a PDF process pool that gevent's monkey-patching would interfere with.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# Curricula, sessions and caches live in process memory, so a session's
+# structure is only visible to the worker that generated it. Keep a single
+# worker unless sticky sessions or shared state are in place.
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+worker_class = 'gthread'
+
+# Concurrent requests per worker (each mostly blocked on LLM I/O)
+threads = int(os.environ.get('GUNICORN_THREADS', 4 * multiprocessing.cpu_count()))
+
+# Ollama fallback generations can take up to a minute
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Must stay False: background threads started at import would not survive the fork
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    """Warm Groq/Ollama connections in the background as each worker starts."""
+    from app import warm_up_engines
+    warm_up_engines()
@@ -0,0 +1,139 @@
+"""
+LLM Client Pool - Ordered failover between providers
+Clients are tried in priority order (Groq, then Ollama). Each has its own
+circuit breaker, so a provider that keeps failing is skipped for a cooldown
+instead of costing every request a round-trip (or a timeout) before the
+fallback is reached.
+"""
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+import requests
+
+from circuit_breaker import CircuitBreaker
+
+log = logging.getLogger(__name__)
+
+
+class LLMClientPool:
+    """Wraps GroqClient/OllamaClient-style clients with per-client circuit breakers."""
+
+    def __init__(self, clients: List[Any], fail_threshold: int = 3, reset_after: float = 30.0):
+        """
+        Initialize client pool.
+
+        Args:
+            clients: Clients in priority order; each provides is_available(),
+                     generate(), agenerate() and generate_stream()
+            fail_threshold: Consecutive failures before a client is skipped
+            reset_after: Seconds to skip a failing client before probing it again
+        """
+        self.clients = clients
+        self.breakers = [CircuitBreaker(fail_threshold, reset_after) for _ in clients]
+
+    @staticmethod
+    def _name(client: Any) -> str:
+        return type(client).__name__.replace('Client', '')
+
+    def _candidates(self) -> List[int]:
+        """
+        Indexes of clients to try, in priority order.
+
+        Clients without credentials or with an open circuit are skipped; if that
+        leaves nothing, the last client (the local fallback) is still tried.
+        """
+        candidates = []
+        for idx, client in enumerate(self.clients):
+            if not client.is_available():
+                continue
+            if self.breakers[idx].is_open():
+                log.warning("⚠️ %s circuit open after repeated failures. Skipping...", self._name(client))
+                continue
+            candidates.append(idx)
+        return candidates or [len(self.clients) - 1]
+
+    def _record(self, idx: int, result: Dict[str, Any]) -> None:
+        """Update a client's breaker from a result dict."""
+        if result['success']:
+            self.breakers[idx].reset()
+        else:
+            self.breakers[idx].record_failure()
+            log.warning("⚠️ %s failed: %s", self._name(self.clients[idx]), result.get('error'))
+
+    def generate(self, prompt: str, options: Optional[Dict] = None, json_mode: bool = True,
+                 clients: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Generate with the first healthy client that succeeds.
+
+        clients: If given, only these clients may serve the request (for requests
+                 sized for them, e.g. output budgets a local model cannot hold);
+                 the result is a failure if none of them is healthy.
+
+        Returns:
+            Dict with 'response', 'generation_time', 'model', 'success'
+            (the last client's failure if every client failed)
+        """
+        # Candidates are chosen once: is_open() hands out the half-open probe,
+        # so asking again before the call could skip the client it just admitted
+        candidates = self._candidates()
+        if clients is not None:
+            candidates = [idx for idx in candidates if self.clients[idx] in clients]
+
+        result = {
+            'response': '',
+            'generation_time': 0.0,
+            'model': None,
+            'success': False,
+            'error': 'No healthy client for this request'
+        }
+        for idx in candidates:
+            client = self.clients[idx]
+            log.info("⚡ Using %s (%s)...", self._name(client), client.model)
+            result = client.generate(prompt, options, json_mode=json_mode)
+            self._record(idx, result)
+            if result['success']:
+                break
+        return result
+
+    async def agenerate(self, prompt: str, options: Optional[Dict] = None, json_mode: bool = True,
+                        client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+        """Async variant of generate(); client is a shared httpx.AsyncClient."""
+        result = None
+        for idx in self._candidates():
+            result = await self.clients[idx].agenerate(prompt, options, json_mode=json_mode, client=client)
+            self._record(idx, result)
+            if result['success']:
+                break
+        return result
+
+    def generate_stream(self, prompt: str, options: Optional[Dict] = None, json_mode: bool = True,
+                        stream_info: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Stream text chunks from the first healthy client.
+        A client that fails before producing output falls through to the next;
+        a failure mid-stream is raised, since chunks were already sent.
+
+        stream_info: Optional dict that receives the 'model' that produced the stream.
+        """
+        if stream_info is None:
+            stream_info = {}
+
+        candidates = self._candidates()
+        for position, idx in enumerate(candidates):
+            client = self.clients[idx]
+            log.info("⚡ Streaming from %s (%s)...", self._name(client), client.model)
+            stream_info['model'] = client.model
+            started = False
+            try:
+                for chunk in client.generate_stream(prompt, options, json_mode=json_mode):
+                    started = True
+                    yield chunk
+                self.breakers[idx].reset()
+                return
+            except (requests.RequestException, ValueError, KeyError) as e:
+                # ValueError covers malformed chunks (orjson.JSONDecodeError)
+                self.breakers[idx].record_failure()
+                if started or position == len(candidates) - 1:
+                    raise
+                log.warning("⚠️ %s failed: %s. Falling back...", self._name(client), e)
@@ -2,13 +2,45 @@
 Optimized Ollama Client for Fast Curriculum Generation
 Target: <20s on Intel i5 11th Gen, 16GB RAM
 """
+import asyncio
 import requests
+import httpx
 import time
-import json
-from typing import Dict, Any, Optional
+import orjson
+from typing import Callable, Dict, Any, Iterator, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cache import ResponseCache
+
+# Retry transient gateway errors (honouring Retry-After)
+_RETRY = Retry(
+    total=2,  # At most 3 attempts per call
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=None,  # Connect errors and these statuses are safe to retry on POSTs,
+    read=False,            # read timeouts are not: the generation may still be running (and billed)
+    raise_on_status=False  # Let raise_for_status() report the final error
+)
+
+# Request bodies are pre-serialized with orjson, so the content type is set by hand
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def _decodes(text: str) -> bool:
+    """Whether text is valid JSON; JSON-mode replies that are not are never cached."""
+    try:
+        orjson.loads(text)
+        return True
+    except orjson.JSONDecodeError:
+        return False
+
+# Keep-alive limits for async clients
+ASYNC_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+
 
 class OllamaClient:
-    def __init__(self, model: str = "qwen2.5:3b", base_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = "qwen2.5:3b", base_url: str = "http://localhost:11434",
+                 cache_responses: bool = True):
         """
         Initialize Ollama client with performance-optimized settings.
         
@@ -18,6 +50,7 @@ class OllamaClient:
                    - phi3:mini (8-12s, good balance)
                    - llama3.2:3b (5-10s, fast backup)
             base_url: Ollama API endpoint
+            cache_responses: Reuse results of identical requests (disable for benchmarks)
         """
         self.model = model
         self.base_url = base_url
@@ -36,79 +69,262 @@ class OllamaClient:
         
         self.timeout = 45  # 45s is plenty for qwen2.5:3b
         
-    def generate(self, prompt: str, options: Optional[Dict] = None) -> Dict[str, Any]:
+        # Per-client connection pool: keeps TCP connections alive across calls
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_RETRY)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Identical requests are answered from memory/disk without a model call
+        self._cache = ResponseCache(namespace=f"ollama:{model}", enabled=cache_responses)
+        
+    def clear_cache(self) -> int:
+        """Forget cached responses; returns the number of in-memory entries dropped."""
+        return self._cache.clear()
+    
+    def is_available(self) -> bool:
+        """Ollama needs no API key; an unreachable server shows up as failed calls."""
+        return True
+    
+    def generate(self, prompt: str, options: Optional[Dict] = None, json_mode: bool = True,
+                 on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Generate response from Ollama with performance tracking.
         
+        The response is streamed and assembled as tokens arrive, returning as
+        soon as Ollama reports done (the read timeout applies per chunk, so
+        long generations are not cut off while tokens keep coming).
+        
         Args:
             prompt: Input prompt (keep under 200 words for speed)
             options: Override default options if needed
+            json_mode: Constrain output to valid JSON (False for Markdown)
+            on_token: Optional callback invoked with each text chunk as it arrives
+            
+        Returns:
+            Dict with 'response', 'generation_time', and 'model'.
+            Fresh JSON-mode results that decode also carry 'parsed', so callers
+            can skip re-parsing.
+        """
+        payload = self._build_payload(prompt, options, json_mode)
+        cache_key = self._cache.make_key(payload)
+        lookup_start = time.perf_counter()
+        cached_result = self._cache.get(cache_key)
+        if cached_result is not None:
+            # Hits report the lookup itself, so they stay comparable below 1 ms
+            return {**cached_result, 'generation_time': time.perf_counter() - lookup_start, 'cached': True}
+        
+        start_time = time.perf_counter()
+        
+        try:
+            chunks = []
+            for chunk in self._stream(payload):
+                chunks.append(chunk)
+                if on_token:
+                    on_token(chunk)
+            
+            elapsed = time.perf_counter() - start_time
+            
+            result = {
+                'response': ''.join(chunks),
+                'generation_time': elapsed,
+                'model': self.model,
+                'success': True
+            }
+            parsed = None
+            if json_mode:
+                try:
+                    parsed = orjson.loads(result['response'])
+                except orjson.JSONDecodeError:
+                    pass  # Left to the caller's lenient parsing
+            
+            # Cached without 'parsed' so callers never share (and mutate) one
+            # object; invalid JSON is not cached, so a retry asks the model again
+            if parsed is not None or not json_mode:
+                self._cache.set(cache_key, result)
+            if parsed is not None:
+                result['parsed'] = parsed
+            return result
+            
+        except requests.Timeout:
+            elapsed = time.perf_counter() - start_time
+            return {
+                'response': '',
+                'generation_time': elapsed,
+                'model': self.model,
+                'success': False,
+                'error': f'Request timeout after {self.timeout}s'
+            }
+            
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            elapsed = time.perf_counter() - start_time
+            return {
+                'response': '',
+                'generation_time': elapsed,
+                'model': self.model,
+                'success': False,
+                'error': str(e)
+            }
+    
+    async def agenerate(self, prompt: str, options: Optional[Dict] = None, json_mode: bool = True,
+                        client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+        """
+        Async variant of generate() for concurrent fan-out.
+        
+        Args:
+            prompt: Input prompt
+            options: Override default options if needed
+            json_mode: Constrain output to valid JSON (False for Markdown)
+            client: Shared httpx.AsyncClient reused across concurrent calls.
+                    A one-off client is used if omitted.
             
         Returns:
             Dict with 'response', 'generation_time', and 'model'
         """
-        start_time = time.time()
+        payload = self._build_payload(prompt, options, json_mode)
+        cache_key = self._cache.make_key(payload)
+        lookup_start = time.perf_counter()
+        cached_result = self._cache.get(cache_key)
+        if cached_result is not None:
+            # Hits report the lookup itself, so they stay comparable below 1 ms
+            return {**cached_result, 'generation_time': time.perf_counter() - lookup_start, 'cached': True}
         
-        # Merge custom options with defaults
-        request_options = {**self.default_options}
-        if options:
-            request_options.update(options)
+        if client is None:
+            async with httpx.AsyncClient(timeout=self.timeout, limits=ASYNC_LIMITS) as own_client:
+                return await self.agenerate(prompt, options, json_mode, client=own_client)
+        
+        start_time = time.perf_counter()
         
         try:
-            response = requests.post(
+            response = await client.post(
                 self.api_url,
-                json={
-                    'model': self.model,
-                    'prompt': prompt,
-                    'stream': False,  # Batch response is faster for this use case
-                    'format': 'json',  # Force valid JSON output - faster + no truncation
-                    'options': request_options
-                },
+                content=orjson.dumps({**payload, 'stream': False}),  # One JSON body
+                headers=_JSON_HEADERS,
                 timeout=self.timeout
             )
             
             response.raise_for_status()
-            result = response.json()
+            result = orjson.loads(response.content)
             
-            elapsed = time.time() - start_time
+            elapsed = time.perf_counter() - start_time
             
-            return {
+            result = {
                 'response': result.get('response', ''),
-                'generation_time': round(elapsed, 2),
+                'generation_time': elapsed,
                 'model': self.model,
                 'success': True
             }
+            if not json_mode or _decodes(result['response']):
+                self._cache.set(cache_key, result)
+            return result
             
-        except requests.Timeout:
-            elapsed = time.time() - start_time
+        except httpx.TimeoutException:
+            elapsed = time.perf_counter() - start_time
             return {
                 'response': '',
-                'generation_time': round(elapsed, 2),
+                'generation_time': elapsed,
                 'model': self.model,
                 'success': False,
                 'error': f'Request timeout after {self.timeout}s'
             }
             
-        except requests.RequestException as e:
-            elapsed = time.time() - start_time
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            elapsed = time.perf_counter() - start_time
             return {
                 'response': '',
-                'generation_time': round(elapsed, 2),
+                'generation_time': elapsed,
                 'model': self.model,
                 'success': False,
                 'error': str(e)
             }
     
+    async def generate_many(self, prompts: List[str], options: Optional[Dict] = None,
+                            concurrency: int = 10) -> List[Dict[str, Any]]:
+        """
+        Generate responses for many prompts concurrently over one connection pool.
+        
+        Args:
+            prompts: Input prompts
+            options: Override default options (applied to every prompt)
+            concurrency: Max requests in flight at once
+            
+        Returns:
+            One result dict per prompt, in the same order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with httpx.AsyncClient(timeout=self.timeout, limits=ASYNC_LIMITS) as client:
+            async def _bounded(prompt: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self.agenerate(prompt, options, client=client)
+            
+            return await asyncio.gather(*[_bounded(p) for p in prompts])
+    
+    def generate_stream(self, prompt: str, options: Optional[Dict] = None, json_mode: bool = True) -> Iterator[str]:
+        """
+        Stream response text from Ollama as tokens are generated.
+        
+        Args:
+            prompt: Input prompt
+            options: Override default options if needed
+            json_mode: Constrain output to valid JSON (False for Markdown)
+            
+        Yields:
+            Text chunks in generation order
+            
+        Raises:
+            requests.RequestException: If the request fails (before or mid-stream)
+        """
+        return self._stream(self._build_payload(prompt, options, json_mode))
+    
+    def _stream(self, payload: Dict[str, Any]) -> Iterator[str]:
+        """POST payload as a streaming /api/generate request and yield its text chunks."""
+        with self.session.post(self.api_url, data=orjson.dumps({**payload, 'stream': True}), headers=_JSON_HEADERS,
+                               stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                
+                chunk = orjson.loads(line)
+                if chunk.get('error'):
+                    raise requests.RequestException(chunk['error'])
+                if chunk.get('response'):
+                    yield chunk['response']
+                if chunk.get('done'):
+                    break
+    
+    def _build_payload(self, prompt: str, options: Optional[Dict], json_mode: bool = True) -> Dict[str, Any]:
+        """
+        Build the /api/generate request body (shared by sync and async paths).
+        'stream' is left for each call site to set, so the same request has one
+        cache key whether it is streamed or not.
+        """
+        # Merge custom options with defaults
+        request_options = {**self.default_options}
+        if options:
+            request_options.update(options)
+        
+        payload = {
+            'model': self.model,
+            'prompt': prompt,
+            'options': request_options
+        }
+        if json_mode:
+            payload['format'] = 'json'  # Force valid JSON output - faster + no truncation
+        return payload
+    
     def warm_up(self) -> Dict[str, Any]:
         """
         Pre-load model into RAM so first real request is fast.
         Call this at app startup to eliminate cold-start latency.
         """
         print(f"🔥 Warming up model: {self.model}...")
-        start = time.time()
+        start = time.perf_counter()
         try:
             # Send a tiny request to force model loading
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
                 json={
                     'model': self.model,
@@ -119,21 +335,21 @@ class OllamaClient:
                 timeout=120  # Model loading can take time first time
             )
             response.raise_for_status()
-            elapsed = time.time() - start
+            elapsed = time.perf_counter() - start
             print(f"✅ Model warmed up in {elapsed:.1f}s - subsequent requests will be FAST")
-            return {'success': True, 'warm_up_time': round(elapsed, 1)}
+            return {'success': True, 'warm_up_time': elapsed}
         except Exception as e:
-            elapsed = time.time() - start
+            elapsed = time.perf_counter() - start
             print(f"⚠️ Warm-up failed ({elapsed:.1f}s): {e}")
             return {'success': False, 'error': str(e)}
 
     def health_check(self) -> Dict[str, Any]:
         """Check if Ollama is running and model is available."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             response.raise_for_status()
             
-            models = response.json().get('models', [])
+            models = orjson.loads(response.content).get('models', [])
             model_available = any(m.get('name', '').startswith(self.model) for m in models)
             
             return {
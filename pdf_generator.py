@@ -2,82 +2,197 @@
 Professional PDF Generator using ReportLab
 Target: <2 seconds generation time
 """
-from reportlab.lib.pagesizes import A4, letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, PageBreak,
-    Table, TableStyle, ListFlowable, ListItem, KeepTogether
-)
-from reportlab.lib import colors
 from html import escape
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import functools
 import io
+import logging
+import multiprocessing
+import os
 import re
+import threading
+from collections import namedtuple
 from datetime import datetime
-from typing import Dict, Any
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator
+
+log = logging.getLogger(__name__)
+
+# Size of each chunk yielded when streaming a finished PDF to the client
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _rl() -> SimpleNamespace:
+    """
+    Import ReportLab on first render.
+    Importing it costs a few hundred ms, and the web process only renders when
+    the worker pool is unavailable, so LLM-only paths and startup never pay it.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
+    
+    # Table layouts are identical for every document/semester; build them once
+    details_table_style = TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ])
+    subjects_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e0e7ff')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#4338ca')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')])
+    ])
+    
+    return SimpleNamespace(
+        colors=colors, letter=letter, inch=inch,
+        getSampleStyleSheet=getSampleStyleSheet, ParagraphStyle=ParagraphStyle,
+        SimpleDocTemplate=SimpleDocTemplate, Paragraph=Paragraph, Spacer=Spacer,
+        PageBreak=PageBreak, Table=Table,
+        details_col_widths=[2*inch, 3*inch], details_table_style=details_table_style,
+        subjects_col_widths=[1*inch, 3.5*inch, 1*inch, 1.2*inch], subjects_table_style=subjects_table_style,
+    )
+
+# Everything the title page and structure section need, gathered in one pass:
+# semester count, course count and each semester's (number, table rows)
+Stats = namedtuple('Stats', ['n_sem', 'n_courses', 'rows_by_sem'])
+
+# Markdown inline formatting, compiled once instead of per line
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_ITAL_RE = re.compile(r'\*(.+?)\*')
+_H_EMOJI_RE = re.compile(r'[^\w\s:()-]')
+_EMOJI_RE = re.compile(r'[^\w\s:().,%\-–—/\'"<>b/i]')
+
+# ReportLab rendering is CPU-bound and holds the GIL; a process pool lets
+# concurrent downloads render in parallel instead of queueing on one core
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+_worker_generator = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Create the shared render pool on first use."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn, not Linux's default fork: the web process already runs
+            # threads (log listener, prefetch and batch workers, keepalive
+            # timers) whose locks a forked child could inherit held
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pdf_pool
+
+
+def _discard_pdf_pool() -> None:
+    """Drop a broken pool so the next render starts a fresh one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False)
+            _pdf_pool = None
+
+
+def _worker() -> "PDFGenerator":
+    """This worker's generator (styles are set up once per process)."""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = PDFGenerator()
+    return _worker_generator
+
+
+def _render_pdf(curriculum: Dict[str, Any]) -> bytes:
+    """Render a curriculum PDF inside a pool worker (top-level so it pickles)."""
+    return _worker()._build_pdf(curriculum).getvalue()
+
+
+def _render_course_pdf(subject_name: str, markdown_content: str) -> bytes:
+    """Render a course syllabus PDF inside a pool worker."""
+    return _worker()._build_course_pdf(subject_name, markdown_content).getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_styles():
+    """
+    Sample stylesheet plus the custom paragraph styles, built once per process
+    and shared by every PDFGenerator (styles are only read while rendering).
+    """
+    rl = _rl()
+    styles = rl.getSampleStyleSheet()
+    
+    # Title style
+    styles.add(rl.ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Title'],
+        fontSize=24,
+        textColor=rl.colors.HexColor('#5b54e0'),
+        spaceAfter=30,
+        alignment=1  # Center
+    ))
+    
+    # Semester header style
+    styles.add(rl.ParagraphStyle(
+        name='SemesterHeader',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=rl.colors.white,
+        backColor=rl.colors.HexColor('#5b54e0'),
+        spaceAfter=12,
+        spaceBefore=12,
+        leftIndent=10,
+        rightIndent=10
+    ))
+    
+    # Course title style
+    styles.add(rl.ParagraphStyle(
+        name='CourseTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=rl.colors.HexColor('#111827'),
+        spaceAfter=6,
+        spaceBefore=12
+    ))
+    
+    # Custom Normal style with better line spacing
+    styles.add(rl.ParagraphStyle(
+        name='CustomNormal',
+        parent=styles['Normal'],
+        fontSize=11,
+        leading=14,
+        textColor=rl.colors.HexColor('#374151')
+    ))
+    
+    # Heading3 with better styling
+    styles.add(rl.ParagraphStyle(
+        name='CustomHeading3',
+        parent=styles['Heading3'],
+        fontSize=12,
+        textColor=rl.colors.HexColor('#4338ca'),
+        spaceAfter=8,
+        spaceBefore=10
+    ))
+    
+    return styles
 
 
 class PDFGenerator:
     """Generate professional curriculum PDFs with ReportLab."""
     
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Create custom paragraph styles for professional formatting."""
-        
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Title'],
-            fontSize=24,
-            textColor=colors.HexColor('#5b54e0'),
-            spaceAfter=30,
-            alignment=1  # Center
-        ))
-        
-        # Semester header style
-        self.styles.add(ParagraphStyle(
-            name='SemesterHeader',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            textColor=colors.white,
-            backColor=colors.HexColor('#5b54e0'),
-            spaceAfter=12,
-            spaceBefore=12,
-            leftIndent=10,
-            rightIndent=10
-        ))
-        
-        # Course title style
-        self.styles.add(ParagraphStyle(
-            name='CourseTitle',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#111827'),
-            spaceAfter=6,
-            spaceBefore=12
-        ))
-        
-        # Custom Normal style with better line spacing
-        self.styles.add(ParagraphStyle(
-            name='CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            leading=14,
-            textColor=colors.HexColor('#374151')
-        ))
-        
-        # Heading3 with better styling
-        self.styles.add(ParagraphStyle(
-            name='CustomHeading3',
-            parent=self.styles['Heading3'],
-            fontSize=12,
-            textColor=colors.HexColor('#4338ca'),
-            spaceAfter=8,
-            spaceBefore=10
-        ))
+    @property
+    def styles(self):
+        """Shared paragraph styles, created on first render."""
+        return _get_styles()
     
     def generate_pdf(self, curriculum: Dict[str, Any], filename: str = None) -> io.BytesIO:
         """
@@ -90,12 +205,39 @@ class PDFGenerator:
         Returns:
             BytesIO buffer containing PDF
         """
+        return self._render(_render_pdf, self._build_pdf, curriculum)
+    
+    def _render(self, render_fn: Callable[..., bytes], build_fn: Callable[..., io.BytesIO], *args: Any) -> io.BytesIO:
+        """
+        Render a document in the worker pool.
+        
+        Args:
+            render_fn: Top-level function run in a worker, returning PDF bytes
+            build_fn: In-process equivalent, used if the pool is unavailable
+            *args: Arguments for either function
+            
+        Returns:
+            BytesIO buffer containing PDF
+        """
+        try:
+            pdf_bytes = _get_pdf_pool().submit(render_fn, *args).result()
+        except (BrokenProcessPool, OSError) as e:
+            # Pool unavailable (e.g. worker crashed or processes not allowed): render inline
+            log.warning("⚠️ PDF worker pool unavailable (%s); rendering in-process", e)
+            _discard_pdf_pool()
+            return build_fn(*args)
+        
+        return io.BytesIO(pdf_bytes)
+    
+    def _build_pdf(self, curriculum: Dict[str, Any]) -> io.BytesIO:
+        """Render the curriculum document into a BytesIO buffer."""
+        rl = _rl()
         buffer = io.BytesIO()
         
         # Create document
-        doc = SimpleDocTemplate(
+        doc = rl.SimpleDocTemplate(
             buffer,
-            pagesize=letter,
+            pagesize=rl.letter,
             rightMargin=72,
             leftMargin=72,
             topMargin=72,
@@ -104,14 +246,15 @@ class PDFGenerator:
         
         # Build content
         story = []
+        stats = self._precompute(curriculum)
         
         # Title Page
-        story.extend(self._build_title_page(curriculum))
+        story.extend(self._build_title_page(curriculum, stats))
         
         # Program Structure
-        story.extend(self._build_structure_section(curriculum))
+        story.extend(self._build_structure_section(stats))
         
-        story.append(PageBreak())
+        story.append(rl.PageBreak())
         
         # Detailed Syllabi (if available)
         # This will be populated when subject details are cached
@@ -122,81 +265,104 @@ class PDFGenerator:
         
         return buffer
     
-    def _build_title_page(self, curriculum: Dict) -> list:
+    def generate_pdf_stream(self, curriculum: Dict[str, Any],
+                            chunk_size: int = PDF_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Generate PDF from curriculum data as an iterator of byte chunks.
+        
+        ReportLab only serializes a document once it is fully built, so the
+        document is rendered up front (errors raise here, before a response
+        starts) and the finished buffer is then streamed without copying it whole.
+        
+        Args:
+            curriculum: Curriculum dictionary
+            chunk_size: Bytes per yielded chunk
+            
+        Returns:
+            Iterator over PDF bytes
+        """
+        return self._iter_chunks(self.generate_pdf(curriculum), chunk_size)
+    
+    @staticmethod
+    def _iter_chunks(buffer: io.BytesIO, chunk_size: int) -> Iterator[bytes]:
+        """Yield a buffer's contents in chunk_size slices."""
+        view = buffer.getbuffer()
+        try:
+            for offset in range(0, len(view), chunk_size):
+                yield bytes(view[offset:offset + chunk_size])
+        finally:
+            view.release()
+    
+    @staticmethod
+    def _precompute(curriculum: Dict) -> Stats:
+        """Walk the semesters once, counting courses and building escaped table rows."""
+        rows_by_sem = []
+        n_courses = 0
+        
+        for sem in curriculum.get('semesters', []):
+            subjects = sem.get('subjects', [])
+            n_courses += len(subjects)
+            rows_by_sem.append((sem.get('semester', 0), [
+                [escape(s.get('code', '')), escape(s.get('name', '')),
+                 str(s.get('credits', 4)), str(s.get('hours_per_week', 3))]
+                for s in subjects
+            ]))
+        
+        return Stats(n_sem=len(rows_by_sem), n_courses=n_courses, rows_by_sem=rows_by_sem)
+    
+    def _build_title_page(self, curriculum: Dict, stats: Stats) -> list:
         """Build title page elements."""
+        rl = _rl()
         elements = []
         
         program_name = escape(curriculum.get('program', 'Academic Program'))
         
-        elements.append(Paragraph(
+        elements.append(rl.Paragraph(
             f"Curriculum for {program_name}",
             self.styles['CustomTitle']
         ))
         
-        elements.append(Spacer(1, 0.5 * inch))
+        elements.append(rl.Spacer(1, 0.5 * rl.inch))
         
         # Program details table
         details = [
-            ['Total Semesters:', str(len(curriculum.get('semesters', [])))],
-            ['Total Courses:', str(sum(len(s.get('subjects', [])) for s in curriculum.get('semesters', [])))],
+            ['Total Semesters:', str(stats.n_sem)],
+            ['Total Courses:', str(stats.n_courses)],
             ['Generated:', datetime.now().strftime('%Y-%m-%d %H:%M')]
         ]
         
-        table = Table(details, colWidths=[2*inch, 3*inch])
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
+        table = rl.Table(details, colWidths=rl.details_col_widths)
+        table.setStyle(rl.details_table_style)
         
         elements.append(table)
-        elements.append(Spacer(1, 0.5 * inch))
+        elements.append(rl.Spacer(1, 0.5 * rl.inch))
         
         return elements
     
-    def _build_structure_section(self, curriculum: Dict) -> list:
+    def _build_structure_section(self, stats: Stats) -> list:
         """Build program structure section."""
+        rl = _rl()
         elements = []
         
-        elements.append(Paragraph("Program Structure", self.styles['Heading1']))
-        elements.append(Spacer(1, 0.2 * inch))
+        elements.append(rl.Paragraph("Program Structure", self.styles['Heading1']))
+        elements.append(rl.Spacer(1, 0.2 * rl.inch))
         
-        for sem in curriculum.get('semesters', []):
-            sem_num = sem.get('semester', 0)
-            subjects = sem.get('subjects', [])
-            
+        for sem_num, rows in stats.rows_by_sem:
             # Semester header
-            elements.append(Paragraph(
-                f"Semester {sem_num}: {len(subjects)} Courses",
+            elements.append(rl.Paragraph(
+                f"Semester {sem_num}: {len(rows)} Courses",
                 self.styles['SemesterHeader']
             ))
             
             # Subjects table
             table_data = [['Code', 'Course Name', 'Credits', 'Hours/Week']]
+            table_data.extend(rows)
             
-            for subj in subjects:
-                table_data.append([
-                    escape(subj.get('code', '')),
-                    escape(subj.get('name', '')),
-                    str(subj.get('credits', 4)),
-                    str(subj.get('hours_per_week', 3))
-                ])
-            
-            table = Table(table_data, colWidths=[1*inch, 3.5*inch, 1*inch, 1.2*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e0e7ff')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#4338ca')),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')])
-            ]))
+            table = rl.Table(table_data, colWidths=rl.subjects_col_widths)
+            table.setStyle(rl.subjects_table_style)
             
             elements.append(table)
-            elements.append(Spacer(1, 0.3 * inch))
+            elements.append(rl.Spacer(1, 0.3 * rl.inch))
         
         return elements    
     def generate_course_pdf(self, subject_name: str, markdown_content: str) -> io.BytesIO:
@@ -210,12 +376,33 @@ class PDFGenerator:
         Returns:
             BytesIO buffer containing PDF
         """
+        return self._render(_render_course_pdf, self._build_course_pdf, subject_name, markdown_content)
+    
+    def generate_course_pdf_stream(self, subject_name: str, markdown_content: str,
+                                   chunk_size: int = PDF_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Generate a course syllabus PDF as an iterator of byte chunks
+        (rendered up front, like generate_pdf_stream).
+        
+        Args:
+            subject_name: Name of the course
+            markdown_content: Markdown-formatted syllabus content
+            chunk_size: Bytes per yielded chunk
+            
+        Returns:
+            Iterator over PDF bytes
+        """
+        return self._iter_chunks(self.generate_course_pdf(subject_name, markdown_content), chunk_size)
+    
+    def _build_course_pdf(self, subject_name: str, markdown_content: str) -> io.BytesIO:
+        """Render the course syllabus document into a BytesIO buffer."""
+        rl = _rl()
         buffer = io.BytesIO()
         
         # Create document
-        doc = SimpleDocTemplate(
+        doc = rl.SimpleDocTemplate(
             buffer,
-            pagesize=letter,
+            pagesize=rl.letter,
             rightMargin=72,
             leftMargin=72,
             topMargin=72,
@@ -225,11 +412,11 @@ class PDFGenerator:
         story = []
         
         # Course title
-        story.append(Paragraph(
+        story.append(rl.Paragraph(
             escape(subject_name),
             self.styles['CustomTitle']
         ))
-        story.append(Spacer(1, 0.3 * inch))
+        story.append(rl.Spacer(1, 0.3 * rl.inch))
         
         # Parse markdown content and convert to PDF elements
         story.extend(self._parse_markdown_to_pdf(markdown_content))
@@ -244,82 +431,78 @@ class PDFGenerator:
         """
         Convert markdown content to ReportLab flowables.
         
+        Text and list items between headings are joined with <br/> into a
+        single Paragraph (blank lines become an empty line), so a syllabus is
+        a few dozen flowables to lay out instead of one or two per line.
+        
         Args:
             markdown_text: Markdown formatted text
             
         Returns:
             List of ReportLab flowable elements
         """
+        rl = _rl()
         elements = []
-        lines = markdown_text.split('\n')
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+        buf = []  # Body lines of the current section
+        
+        def flush():
+            while buf and not buf[-1]:
+                buf.pop()
+            if buf:
+                elements.append(rl.Paragraph('<br/>'.join(buf), self.styles['CustomNormal']))
+                elements.append(rl.Spacer(1, 0.1 * rl.inch))
+                buf.clear()
+        
+        for line in markdown_text.splitlines():
+            line = line.strip()
             
-            # Skip empty lines but add small spacing
+            # Blank line: paragraph break within the section
             if not line:
-                elements.append(Spacer(1, 0.05 * inch))
-                i += 1
-                continue
+                if buf and buf[-1]:
+                    buf.append('')
             
             # H2 headers (##)
-            if line.startswith('## '):
+            elif line.startswith('## '):
+                flush()
                 header_text = line[3:].strip()
                 # Remove emoji if present
-                header_text = re.sub(r'[^\w\s:()-]', '', header_text).strip()
-                elements.append(Spacer(1, 0.25 * inch))
-                elements.append(Paragraph(
+                header_text = _H_EMOJI_RE.sub('', header_text).strip()
+                elements.append(rl.Spacer(1, 0.25 * rl.inch))
+                elements.append(rl.Paragraph(
                     header_text,
                     self.styles['Heading2']
                 ))
-                elements.append(Spacer(1, 0.15 * inch))
+                elements.append(rl.Spacer(1, 0.15 * rl.inch))
             
             # H3 headers (###)
             elif line.startswith('### '):
+                flush()
                 header_text = line[4:].strip()
                 # Remove emoji if present
-                header_text = re.sub(r'[^\w\s:()-]', '', header_text).strip()
-                elements.append(Spacer(1, 0.2 * inch))
-                elements.append(Paragraph(
+                header_text = _H_EMOJI_RE.sub('', header_text).strip()
+                elements.append(rl.Spacer(1, 0.2 * rl.inch))
+                elements.append(rl.Paragraph(
                     f"<b>{escape(header_text)}</b>",
                     self.styles['CustomHeading3']
                 ))
-                elements.append(Spacer(1, 0.1 * inch))
+                elements.append(rl.Spacer(1, 0.1 * rl.inch))
             
             # List items (-)
             elif line.startswith('- '):
-                list_items = []
-                while i < len(lines) and lines[i].strip().startswith('- '):
-                    item_text = lines[i].strip()[2:]
-                    # Handle bold text (**text**)
-                    item_text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', item_text)
-                    # Handle italic text (*text*)
-                    item_text = re.sub(r'\*(.+?)\*', r'<i>\1</i>', item_text)
-                    list_items.append(item_text)
-                    i += 1
-                
-                # Create list with proper indentation
-                for item in list_items:
-                    elements.append(Paragraph(
-                        f"&nbsp;&nbsp;&nbsp;• {item}",
-                        self.styles['CustomNormal']
-                    ))
-                    elements.append(Spacer(1, 0.08 * inch))
-                
-                continue  # Skip the i += 1 at the end
+                # Handle bold text (**text**)
+                item_text = _BOLD_RE.sub(r'<b>\1</b>', line[2:])
+                # Handle italic text (*text*)
+                item_text = _ITAL_RE.sub(r'<i>\1</i>', item_text)
+                buf.append(f"&nbsp;&nbsp;&nbsp;• {item_text}")
             
             # Regular paragraph
             else:
                 # Handle bold text
-                text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', line)
+                text = _BOLD_RE.sub(r'<b>\1</b>', line)
                 # Handle italic text
-                text = re.sub(r'\*(.+?)\*', r'<i>\1</i>', text)
+                text = _ITAL_RE.sub(r'<i>\1</i>', text)
                 # Remove emoji
-                text = re.sub(r'[^\w\s:().,%\-–—/\'"<>b/i]', '', text)
-                elements.append(Paragraph(text, self.styles['CustomNormal']))
-                elements.append(Spacer(1, 0.1 * inch))
-            
-            i += 1
+                buf.append(_EMOJI_RE.sub('', text))
         
+        flush()
         return elements
\ No newline at end of file
@@ -2,7 +2,54 @@
 Speed-Optimized Prompt Templates for Curriculum Generation
 Key: Shorter prompts = faster responses (target: <200 words)
 """
+import functools
+from typing import List, Tuple
 
+
+# JSON shape and rules of one curriculum (shared by single and batched requests)
+_CURRICULUM_SHAPE = """{
+  "program": "<program name>",
+  "semesters": [
+    {
+      "semester": 1,
+      "subjects": [
+        {"name": "Course Name", "code": "SKL101", "credits": 3, "hours_per_week": 4, "description": "Brief description", "topics": ["Topic1", "Topic2"]},
+        {"name": "Advanced Course", "code": "SKL102", "credits": 4, "hours_per_week": 5, "description": "Brief description", "topics": ["Topic1", "Topic2"]}
+      ]
+    },
+    ... (one object per semester, numbered from 1)
+  ]
+}"""
+
+_STRUCTURE_RULES = """MANDATORY RULES:
+- Generate EXACTLY the number of semesters requested below, numbered from 1
+- Each semester must have EXACTLY 3 courses
+- Each subject needs: name, code, credits (3-4 based on complexity), hours_per_week (4-6), description (8 words max), topics (2 items)
+- Vary credits: foundational courses = 3 credits, advanced/major courses = 4 credits
+- Vary hours: lighter courses = 4-5 hours/week, intensive courses = 5-6 hours/week
+- Progressive difficulty across semesters
+- Unique realistic course codes"""
+
+# Static instructions shared by every structure request. Kept first and
+# byte-identical so provider-side prompt caching (Groq) and Ollama's KV
+# cache can reuse the prefix; only the short request line at the end varies.
+_STRUCTURE_PREFIX = f"""Respond with ONLY valid JSON (no markdown, no explanation) in exactly this shape:
+{_CURRICULUM_SHAPE}
+
+{_STRUCTURE_RULES}
+
+"""
+
+_BATCH_STRUCTURE_PREFIX = f"""Generate one curriculum for each numbered request at the end of this message.
+Respond with ONLY valid JSON (no markdown, no explanation) of the form {{"results": [...]}}, with one curriculum per request, in request order. Each curriculum has exactly this shape:
+{_CURRICULUM_SHAPE}
+
+{_STRUCTURE_RULES}
+
+"""
+
+
+@functools.lru_cache(maxsize=256)  # Demos repeat the same few skill/level combinations
 def build_structure_prompt(skill: str, level: str, semesters: int, hours: str, industry: str = "") -> str:
     """
     Build optimized prompt for curriculum structure generation.
@@ -12,6 +59,7 @@ def build_structure_prompt(skill: str, level: str, semesters: int, hours: str, i
     - JSON format requirement (faster to parse)
     - One-shot example (reduces back-and-forth)
     - Pre-calculated structure (don't ask AI to decide)
+    - Static prefix + short dynamic request line (prompt-cache friendly)
     """
     
     courses_per_sem = 3  # Groq is fast enough for 3 courses/semester
@@ -19,61 +67,29 @@ def build_structure_prompt(skill: str, level: str, semesters: int, hours: str, i
     
     industry_note = f", {industry} focus" if industry else ""
     
-    # Build semester structure examples to make the requirement crystal clear
-    semester_examples = []
-    for sem_num in range(1, min(semesters + 1, 3)):  # Show first 2 semesters as examples
-        semester_examples.append(f"""    {{
-      "semester": {sem_num},
-      "subjects": [
-        {{"name": "Course Name", "code": "SKL{sem_num}01", "credits": 3, "hours_per_week": 4, "description": "Brief description", "topics": ["Topic1", "Topic2"]}},
-        {{"name": "Advanced Course", "code": "SKL{sem_num}02", "credits": 4, "hours_per_week": 5, "description": "Brief description", "topics": ["Topic1", "Topic2"]}}
-      ]
-    }}""")
-    
-    # Add ellipsis if more than 2 semesters
-    if semesters > 2:
-        semester_examples.append(f"""    ... (continue through semester {semesters})""")
-    
-    semester_structure = ",\n".join(semester_examples)
-    
-    prompt = f"""Generate a {level} curriculum for "{skill}"{industry_note}.
+    return _STRUCTURE_PREFIX + f"""REQUEST: Generate a {level} curriculum for "{skill}"{industry_note} (use it as "program").
+CRITICAL REQUIREMENT: EXACTLY {semesters} semesters (no more, no fewer), {courses_per_sem} courses per semester ({total_courses} courses total), {hours} hours/week."""
 
-CRITICAL REQUIREMENT: Generate EXACTLY {semesters} semesters, {courses_per_sem} courses per semester, {hours} hours/week.
 
-Respond with ONLY valid JSON (no markdown, no explanation):
-{{
-  "program": "{skill}",
-  "semesters": [
-{semester_structure}
-  ]
-}}
-
-MANDATORY RULES:
-- Generate EXACTLY {semesters} semesters (NOT 8, NOT 4, EXACTLY {semesters}!)
-- Each semester must have EXACTLY {courses_per_sem} courses
-- Total courses: {total_courses}
-- Include all semesters from 1 to {semesters}
-- Each subject needs: name, code, credits (3-4 based on complexity), hours_per_week (4-6), description (8 words max), topics (2 items)
-- Vary credits: foundational courses = 3 credits, advanced/major courses = 4 credits
-- Vary hours: lighter courses = 4-5 hours/week, intensive courses = 5-6 hours/week
-- Progressive difficulty across semesters
-- Unique realistic course codes"""
-    
-    return prompt
-
-
-def build_subject_detail_prompt(subject: str, program: str) -> str:
+def build_batch_structure_prompt(items: List[Tuple[str, str, int, str]]) -> str:
     """
-    Build optimized prompt for subject syllabus generation.
+    Build one prompt that asks for several curriculum structures at once.
     
-    OPTIMIZATION: Structured prompt for complete syllabus generation
+    OPTIMIZATION: One round-trip for many (skill, level, semesters, hours)
+    requests; the model returns {"results": [...]} in request order.
     """
     
-    prompt = f"""Design a detailed syllabus for the course **"{subject}"** in the {program} program.
+    request_lines = "\n".join(
+        f'{i}. A {level} curriculum for "{skill}" (use it as "program"): EXACTLY {semesters} semesters, '
+        f'3 courses per semester ({semesters * 3} courses total), {hours} hours/week.'
+        for i, (skill, level, semesters, hours) in enumerate(items, 1)
+    )
+    
+    return _BATCH_STRUCTURE_PREFIX + f"REQUESTS:\n{request_lines}"
 
-Format your response in clean Markdown exactly like this:
 
-## 🎯 Course Objective
+# Markdown layout shared by the single-subject and batched syllabus prompts
+SYLLABUS_FORMAT = """## 🎯 Course Objective
 One clear sentence about what students will learn.
 
 ## 📋 Course Modules
@@ -145,8 +161,55 @@ Suggest 2-3 relevant industry certifications that align with this course:
 Examples: AWS Certified Solutions Architect, Google Cloud Professional, Microsoft Azure Administrator, CompTIA Security+, Oracle Certified Professional, Cisco CCNA, etc.
 
 IMPORTANT: Complete ALL sections fully. Include 5 units with specific week allocations."""
+
+
+# Static head of the syllabus prompts (prompt-cache friendly, see _STRUCTURE_PREFIX)
+_SUBJECT_PREFIX = f"""Design a detailed syllabus for the course named at the end of this message.
+
+Format your response in clean Markdown exactly like this:
+
+{SYLLABUS_FORMAT}
+
+"""
+
+_BATCH_SUBJECT_PREFIX = f"""Design a detailed syllabus for each course listed at the end of this message.
+
+Format each syllabus in clean Markdown exactly like this:
+
+{SYLLABUS_FORMAT}
+
+Respond with ONLY a valid JSON object mapping each course name, exactly as listed, to its syllabus as a Markdown string.
+
+"""
+
+
+@functools.lru_cache(maxsize=1024)
+def build_subject_detail_prompt(subject: str, program: str) -> str:
+    """
+    Build optimized prompt for subject syllabus generation.
+    
+    OPTIMIZATION: Structured prompt for complete syllabus generation;
+    the static format comes first so repeated calls share a cached prefix
+    """
     
-    return prompt
+    return _SUBJECT_PREFIX + f'COURSE: **"{subject}"** in the {program} program.'
+
+
+def build_batch_subject_detail_prompt(subjects: List[str], program: str) -> str:
+    """
+    Build one prompt that asks for several subject syllabi at once.
+    
+    OPTIMIZATION: Shares the instructions and a single round-trip across subjects;
+    the model returns a JSON object mapping each subject name to its Markdown.
+    """
+    
+    course_list = "\n".join(f'- "{subject}"' for subject in subjects)
+    example = ", ".join(f'"{subject}": "## 🎯 Course Objective\\n..."' for subject in subjects[:2])
+    
+    return _BATCH_SUBJECT_PREFIX + f"""Example: {{{example}}}
+
+COURSES ({program} program):
+{course_list}"""
 
 
 # Prompt length validation
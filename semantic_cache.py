@@ -0,0 +1,244 @@
+"""
+Semantic Response Cache - Reuse LLM output for near-duplicate requests
+"Intro to Machine Learning" and "Introduction to Machine Learning" should not
+each pay a multi-second LLM round-trip.
+
+Keys are short semantic strings (e.g. a subject name), never full prompts:
+prompts share hundreds of words of template boilerplate, which would make
+unrelated requests look identical. Context that must match exactly (the
+program a subject belongs to, the model) goes in the scope, not the key:
+a long shared program name would otherwise outweigh the subject itself.
+
+Lookups go through an inverted index from trigram to entries, so only entries
+sharing one of the key's rarer trigrams are scored instead of every cached vector.
+"""
+import math
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import orjson
+
+# Tokens that change meaning even though they barely change the text
+# ("Calculus I" vs "Calculus II", "Operating Systems Lab"); they must match
+# exactly for a hit
+_ORDINAL_TOKENS = frozenset({
+    'i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x',
+    'basic', 'intermediate', 'advanced',
+    'lab', 'laboratory', 'practical', 'project', 'seminar', 'workshop'
+})
+
+# Common course-name abbreviations, expanded before embedding so
+# "Intro to ML" and "Introduction to Machine Learning" land close together
+_ABBREVIATIONS = {
+    'intro': 'introduction',
+    'adv': 'advanced',
+    'fund': 'fundamentals',
+    'prog': 'programming',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'dl': 'deep learning',
+    'nlp': 'natural language processing',
+    'cv': 'computer vision',
+    'ds': 'data science',
+    'dsa': 'data structures algorithms',
+    'db': 'databases',
+    'dbms': 'database management systems',
+    'os': 'operating systems',
+    'oop': 'object oriented programming',
+    'oops': 'object oriented programming',
+    'se': 'software engineering',
+    'cs': 'computer science',
+    'iot': 'internet things',
+    'ui': 'user interface',
+    'ux': 'user experience',
+}
+
+# Filler words that only dilute the similarity of short names
+_STOPWORDS = frozenset({'to', 'of', 'the', 'and', 'in', 'for', 'a', 'an', 'with', 'on'})
+
+# Bumped whenever embed() changes so stale vectors on disk are discarded
+_EMBED_VERSION = 3
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+class SemanticCache:
+    """Similarity-based cache over lightweight character n-gram embeddings."""
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 2048, path: Optional[str] = None):
+        """
+        Initialize semantic cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit (0-1)
+            max_entries: Oldest entries are evicted beyond this size
+            path: Optional JSON file to load from / save to
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+
+        # entry id -> (vector, signature, response), oldest first
+        self._entries: Dict[int, Tuple[Dict[int, float], Tuple[str, ...], Any]] = {}
+        self._postings: Dict[int, Set[int]] = {}  # trigram hash -> entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        if path:
+            self.load()
+
+    @staticmethod
+    def normalize(text: str) -> List[str]:
+        """Lowercase, expand abbreviations and drop filler words."""
+        tokens = []
+        for token in _TOKEN_RE.findall(text.lower()):
+            expanded = _ABBREVIATIONS.get(token)
+            if expanded:
+                tokens.extend(expanded.split())
+            elif token not in _STOPWORDS:
+                tokens.append(token)
+        return tokens
+
+    @staticmethod
+    def embed(text: str) -> Tuple[Dict[int, float], Tuple[str, ...]]:
+        """
+        Embed text as an L2-normalized sparse vector of hashed character trigrams.
+
+        Returns:
+            (vector, signature) where signature holds tokens that must match exactly
+        """
+        tokens = SemanticCache.normalize(text)
+        counts: Dict[int, float] = {}
+        for token in tokens:
+            padded = f" {token} "
+            for i in range(len(padded) - 2):
+                h = zlib.crc32(padded[i:i + 3].encode())
+                counts[h] = counts.get(h, 0.0) + 1.0
+
+        norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+        vector = {h: v / norm for h, v in counts.items()}
+        signature = tuple(sorted(t for t in tokens if t in _ORDINAL_TOKENS or t.isdigit()))
+        return vector, signature
+
+    @staticmethod
+    def _signature(signature: Tuple[str, ...], scope: str) -> Tuple[str, ...]:
+        """Prefix an embedding's exact-match tokens with the normalized scope."""
+        return (' '.join(SemanticCache.normalize(scope)),) + signature
+
+    def get(self, key: str, scope: str = '') -> Optional[Any]:
+        """
+        Return the cached response most similar to key, or None below threshold.
+
+        Only entries stored under the same scope (compared after normalization) can match.
+        """
+        vector, signature = self.embed(key)
+        signature = self._signature(signature, scope)
+
+        with self._lock:
+            best_score, best_id = 0.0, -1
+            for entry_id in sorted(self._candidates(vector)):
+                cached, cached_signature, _ = self._entries[entry_id]
+                if cached_signature != signature:
+                    continue
+                score = sum(v * cached.get(h, 0.0) for h, v in vector.items())
+                if score > best_score:
+                    best_score, best_id = score, entry_id
+
+            if best_id >= 0 and best_score >= self.threshold:
+                return self._entries[best_id][2]
+
+        return None
+
+    def _candidates(self, vector: Dict[int, float]) -> Set[int]:
+        """
+        Entries that can reach the threshold (caller holds the lock).
+
+        Trigrams are probed rarest first. Once the query weight left unprobed
+        has norm below the threshold, an entry sharing only those trigrams
+        cannot reach it (Cauchy-Schwarz on unit vectors), so the common
+        trigrams - e.g. of the program name every key shares - are never scanned.
+        """
+        ordered = sorted(vector.items(), key=lambda item: len(self._postings.get(item[0], ())))
+        remaining = sum(v * v for v in vector.values())
+        threshold_sq = self.threshold * self.threshold
+
+        candidates: Set[int] = set()
+        for h, v in ordered:
+            if remaining < threshold_sq:
+                break
+            candidates.update(self._postings.get(h, ()))
+            remaining -= v * v
+        return candidates
+
+    def put(self, key: str, response: Any, scope: str = '') -> None:
+        """Store a response under key within scope."""
+        vector, signature = self.embed(key)
+        signature = self._signature(signature, scope)
+
+        with self._lock:
+            self._add(vector, signature, response)
+
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def _add(self, vector: Dict[int, float], signature: Tuple[str, ...], response: Any) -> None:
+        """Insert an entry and index its trigrams (caller holds the lock)."""
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (vector, signature, response)
+        for h in vector:
+            self._postings.setdefault(h, set()).add(entry_id)
+
+    def _evict_oldest(self) -> None:
+        """Drop the oldest entry and its postings (caller holds the lock)."""
+        entry_id = next(iter(self._entries))
+        vector = self._entries.pop(entry_id)[0]
+        for h in vector:
+            ids = self._postings[h]
+            ids.discard(entry_id)
+            if not ids:
+                del self._postings[h]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """Load entries from disk (missing or corrupt files start empty)."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            # JSON rather than pickle: the path is configurable, and loading a
+            # pickle from it would run whatever code the file contains
+            with open(self.path, 'rb') as f:
+                data = orjson.loads(f.read())
+            if data.get('version') != _EMBED_VERSION:
+                print("⚠️ Semantic cache was built by an older embedding; starting empty")
+                return
+            with self._lock:
+                self._entries.clear()
+                self._postings.clear()
+                for vector, signature, response in zip(data['vectors'], data['signatures'], data['responses']):
+                    self._add(dict(vector), tuple(signature), response)
+        except Exception as e:
+            print(f"⚠️ Could not load semantic cache ({e}); starting empty")
+
+    def save(self) -> None:
+        """Persist entries to disk (atomic replace)."""
+        if not self.path:
+            return
+        with self._lock:
+            entries = list(self._entries.values())
+            data = {
+                'version': _EMBED_VERSION,
+                # Trigram hashes are ints, so vectors are stored as [hash, weight] pairs
+                'vectors': [list(vector.items()) for vector, _, _ in entries],
+                'signatures': [signature for _, signature, _ in entries],
+                'responses': [response for _, _, response in entries]
+            }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_path, self.path)
@@ -1,44 +1,328 @@
-"""Speed test - Groq vs Ollama"""
+"""Speed test - Groq vs Ollama
+
+Re-runs are answered from the clients' on-disk response cache (see cache.py),
+and near-identical requests from a semantic cache; pass --no-cache to time
+real provider calls. --batch asks each provider for several curricula in a
+single call instead; --stream times the first token and each semester as the
+response streams in. --prefetch also generates likely follow-up requests
+(the same skill at another level or length) into the cache.
+Set WARMUP=1 to load models and open connections before timing starts, so
+the numbers reflect steady-state speed rather than a cold start.
+Set TEST_SPEED_CPUS (e.g. "0-3" or "0,2") to pin the run to those CPUs on
+Linux, like `taskset -c`, for repeatable numbers on a benchmark machine.
+"""
 from groq_client import GroqClient
 from ollama_client import OllamaClient
-from prompt_templates import build_structure_prompt
-import json
+from prompt_templates import build_structure_prompt, build_batch_structure_prompt
+from semantic_cache import SemanticCache
+import asyncio
+import orjson
 import os
+import re
+import sys
+import time
+
+BAR = "=" * 50
+
+SKILL, LEVEL, SEMESTERS, HOURS = "Machine Learning", "Undergraduate", 2, "20-25"
+REQUEST = (SKILL, LEVEL, SEMESTERS, HOURS)
+
+# Requests sent together by --batch (one round-trip for all of them)
+BATCH_ITEMS = [
+    (SKILL, LEVEL, SEMESTERS, HOURS),
+    ("Web Development", "Undergraduate", 2, "20-25"),
+    ("Data Science", "Graduate", 2, "20-25"),
+]
+
+# Variants a user is likely to try next, warmed into the cache by --prefetch
+PREFETCH_ITEMS = [
+    (SKILL, "Graduate", SEMESTERS, HOURS),
+    (SKILL, LEVEL, 4, HOURS),
+]
+
+# WARMUP=1: warm every provider up before the timed calls
+WARMUP = os.environ.get('WARMUP') == '1'
+
+# TEST_SPEED_CPUS: CPU list to pin the process to (unset: no pinning)
+PIN_CPUS = os.environ.get('TEST_SPEED_CPUS', '').strip()
+
+SEMANTIC_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.test_speed_semantic.json')
+
+# Markdown code fences some models wrap around JSON, stripped in one pass
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+# Semester numbers as they appear in streamed JSON
+_SEMESTER_RE = re.compile(r'"semester"\s*:\s*(\d+)')
+
+# Set in __main__ (None with --no-cache)
+semantic_cache = None
+
+# Cache hits/misses across this run
+stats = {'hits': 0, 'misses': 0}
+
 
-def test_model(client, name):
-    print(f"\n{'=' * 50}")
-    print(f"TESTING: {name}")
-    print(f"{'=' * 50}")
+def _pin_cpus(spec):
+    """Restrict this process (and every thread it starts) to a CPU list like "0-3,6"."""
+    if not hasattr(os, 'sched_setaffinity'):
+        print("⚠️ TEST_SPEED_CPUS ignored: CPU pinning is not supported on this platform")
+        return
+    try:
+        cpus = set()
+        for part in spec.split(','):
+            first, _, last = part.partition('-')
+            cpus.update(range(int(first), int(last or first) + 1))
+        os.sched_setaffinity(0, cpus)
+        print(f"📌 Pinned to CPUs {sorted(os.sched_getaffinity(0))}")
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Could not pin to CPUs {spec!r}: {e}")
+
+
+def _decode_json(text):
+    """
+    Decode a JSON object reply, ignoring markdown fences around it.
     
-    prompt = build_structure_prompt("Machine Learning", "Undergraduate", 2, "20-25")
+    Returns:
+        (data, None) on success, or (None, error message)
+    """
+    text = _FENCE_RE.sub('', text).strip()
+    # Cheap check first: prose or truncated replies never reach the decoder
+    if not text.startswith('{'):
+        return None, "reply is not a JSON object"
+    try:
+        return orjson.loads(text), None
+    except orjson.JSONDecodeError as e:
+        return None, str(e)
+
+
+def _semantic_key(client, request):
+    """
+    Semantic-cache (scope, key) for a structure request.
     
-    print("Generating curriculum...")
-    result = client.generate(prompt)
+    Only the skill is matched by similarity ("Intro to ML" reuses "Machine
+    Learning"); model, level and semester count must match exactly. Hours are
+    left out so small tweaks ("20-24") still reuse the answer.
+    """
+    skill, level, semesters, _ = request
+    return f"{client.model} | {level} | {semesters} semesters", skill
+
+
+async def test_model(client, name, request=REQUEST):
+    """Generate a curriculum for request with one client and print its report."""
+    scope, semantic_key = _semantic_key(client, request)
+    lookup_start = time.perf_counter()
+    result = semantic_cache.get(semantic_key, scope=scope) if semantic_cache is not None else None
     
-    print(f"\nSUCCESS: {result['success']}")
-    print(f"TIME:    {result['generation_time']}s")
+    if result is not None:
+        result = {**result, 'generation_time': time.perf_counter() - lookup_start, 'cached': True}
+        cache_status = 'semantic hit'
+    else:
+        # Blocking client call in a worker thread so providers run concurrently
+        result = await asyncio.to_thread(client.generate, build_structure_prompt(*request))
+        cache_status = 'hit' if result.get('cached') else 'miss'
+        if result['success'] and semantic_cache is not None:
+            semantic_cache.put(semantic_key, result, scope=scope)
+    stats['hits' if result.get('cached') else 'misses'] += 1
+    
+    # Report built up and written in one call (no awaits) so concurrent
+    # tests never interleave
+    lines = []
+    try:
+        lines.append(f"\n{BAR}\nTESTING: {name}\n{BAR}")
+        lines.append(f"\nSUCCESS: {result['success']}")
+        lines.append(f"TIME:    {result['generation_time'] * 1000:.2f} ms")
+        lines.append(f"CACHE:   {cache_status}")
+        
+        if result['success']:
+            # Fresh results arrive already decoded by the client
+            data, error = result.get('parsed'), None
+            if data is None:
+                data, error = _decode_json(result['response'])
+            if error is None:
+                semesters = data.get('semesters', [])
+                lines.append(f"Semesters: {len(semesters)}")
+                for sem in semesters:
+                    lines.append(f"  Sem {sem.get('semester', '?')}: {len(sem.get('subjects', []))} courses")
+                lines.append("JSON PARSE: OK")
+            else:
+                lines.append(f"JSON PARSE FAILED: {error}")
+                lines.append(result['response'][:300])
+        else:
+            lines.append(f"Error: {result.get('error')}")
+    finally:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+async def test_batch(client, name, items=BATCH_ITEMS):
+    """Generate several curricula in one call with one client and print its report."""
+    result = await asyncio.to_thread(client.generate, build_batch_structure_prompt(items))
+    stats['hits' if result.get('cached') else 'misses'] += 1
+    
+    # Report built up and written in one call (no awaits) so concurrent
+    # tests never interleave
+    lines = []
+    try:
+        lines.append(f"\n{BAR}\nTESTING: {name} - batch of {len(items)}\n{BAR}")
+        lines.append(f"\nSUCCESS: {result['success']}")
+        per_item_ms = result['generation_time'] * 1000 / len(items)
+        lines.append(f"TIME:    {result['generation_time'] * 1000:.2f} ms ({per_item_ms:.2f} ms per curriculum)")
+        lines.append(f"CACHE:   {'hit' if result.get('cached') else 'miss'}")
+        
+        if result['success']:
+            data, error = result.get('parsed'), None
+            if data is None:
+                data, error = _decode_json(result['response'])
+            if error is None:
+                curricula = data.get('results', [])
+                lines.append(f"Curricula: {len(curricula)}/{len(items)}")
+                for (skill, level, _, _), curriculum in zip(items, curricula):
+                    lines.append(f"  {skill} ({level}): {len(curriculum.get('semesters', []))} semesters")
+                lines.append("JSON PARSE: OK")
+            else:
+                lines.append(f"JSON PARSE FAILED: {error}")
+                lines.append(result['response'][:300])
+        else:
+            lines.append(f"Error: {result.get('error')}")
+    finally:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+def _consume_stream(client, prompt):
+    """
+    Read a streamed response, timing the first token and each new semester.
     
-    if result['success']:
+    Returns:
+        (full text, total seconds, [(event, seconds)])
+    """
+    start = time.perf_counter()
+    chunks, events = [], []
+    tail, last_semester = '', 0
+    
+    for chunk in client.generate_stream(prompt):
+        if not chunks:
+            events.append(('first token', time.perf_counter() - start))
+        chunks.append(chunk)
+        
+        # Scan only the new text plus a short overlap, never the whole buffer
+        tail = tail[-32:] + chunk
+        for match in _SEMESTER_RE.finditer(tail):
+            number = int(match.group(1))
+            if number > last_semester:
+                last_semester = number
+                events.append((f'semester {number}', time.perf_counter() - start))
+    
+    return ''.join(chunks), time.perf_counter() - start, events
+
+
+async def test_stream(client, name, request=REQUEST):
+    """Stream a curriculum for request from one client and print when each part arrived."""
+    try:
+        text, elapsed, events = await asyncio.to_thread(_consume_stream, client, build_structure_prompt(*request))
+        error = None
+    except Exception as e:
+        text, elapsed, events, error = '', 0.0, [], e
+    
+    # Report built up and written in one call (no awaits) so concurrent
+    # tests never interleave
+    lines = []
+    try:
+        lines.append(f"\n{BAR}\nTESTING: {name} - streaming\n{BAR}")
+        lines.append(f"\nSUCCESS: {error is None}")
+        lines.append(f"TIME:    {elapsed * 1000:.2f} ms")
+        for event, at in events:
+            lines.append(f"  {at * 1000:9.2f} ms  {event}")
+        
+        if error is not None:
+            lines.append(f"Error: {error}")
+            return
+        data, error = _decode_json(text)
+        if error is None:
+            lines.append(f"Semesters: {len(data.get('semesters', []))}")
+            lines.append("JSON PARSE: OK")
+        else:
+            lines.append(f"JSON PARSE FAILED: {error}")
+            lines.append(text[:300])
+    finally:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+async def prefetch(client, items=PREFETCH_ITEMS):
+    """Generate likely follow-up curricula into the client's response cache."""
+    results = await asyncio.gather(*(
+        asyncio.to_thread(client.generate, build_structure_prompt(*item)) for item in items
+    ))
+    warmed = sum(1 for result in results if result['success'])
+    print(f"\nPrefetched {warmed}/{len(items)} follow-up curricula with {client.model}")
+
+
+async def main(use_cache, batch=False, stream=False, prefetch_next=False):
+    """Test every available provider concurrently, reporting each as it finishes."""
+    test = test_batch if batch else test_stream if stream else test_model
+    tests = []
+    clients = []
+    
+    # Groq
+    groq = GroqClient(cache_responses=use_cache)
+    if groq.is_available():
+        clients.append(groq)
+        tests.append(test(groq, f"Groq ({groq.model})"))
+    else:
+        print("\n⚠️  GROQ_API_KEY not set!")
+        print("   Get free key: https://console.groq.com")
+        print("   Then run: $env:GROQ_API_KEY='gsk_your_key_here'")
+        print("   Then re-run: python test_speed.py")
+    
+    # Ollama (local fallback)
+    ollama = OllamaClient(model="qwen2.5:1.5b", cache_responses=use_cache)
+    health = await asyncio.to_thread(ollama.health_check)
+    if health['ollama_connected']:
+        clients.append(ollama)
+        tests.append(test(ollama, f"Ollama ({ollama.model})"))
+    else:
+        print("\n⚠️  Ollama not running - skipping local test (start it with: ollama serve)")
+    
+    # Ollama's first call loads the model (and Groq's opens a TLS connection);
+    # pay that here instead of in the reported times
+    if WARMUP:
+        await asyncio.gather(*(asyncio.to_thread(client.warm_up) for client in clients))
+    
+    print(f"\nGenerating curriculum with {len(tests)} provider(s)...")
+    
+    # Prefetch through the preferred provider: Groq alongside the timed calls,
+    # but a local Ollama only once its own timed call is done, so the extra
+    # prompts cannot skew it
+    prefetch_client = clients[0] if prefetch_next and use_cache and clients else None
+    warming = None
+    if prefetch_client is groq:
+        warming = asyncio.create_task(prefetch(groq))
+    
+    # Reports print in completion order; one provider failing must not
+    # cancel the other's report
+    for finished in asyncio.as_completed(tests):
         try:
-            resp = result['response'].strip().replace('```json', '').replace('```', '').strip()
-            data = json.loads(resp)
-            semesters = data.get('semesters', [])
-            print(f"Semesters: {len(semesters)}")
-            for sem in semesters:
-                print(f"  Sem {sem['semester']}: {len(sem.get('subjects', []))} courses")
-            print("JSON PARSE: OK")
+            await finished
         except Exception as e:
-            print(f"JSON PARSE FAILED: {e}")
-            print(result['response'][:300])
-    else:
-        print(f"Error: {result.get('error')}")
-
-# Test Groq
-groq = GroqClient()
-if groq.is_available():
-    test_model(groq, f"Groq ({groq.model})")
-else:
-    print("\n⚠️  GROQ_API_KEY not set!")
-    print("   Get free key: https://console.groq.com")
-    print("   Then run: $env:GROQ_API_KEY='gsk_your_key_here'")
-    print("   Then re-run: python test_speed.py")
+            print(f"\n❌ Test crashed: {e!r}")
+    
+    if prefetch_client is not None and warming is None:
+        warming = asyncio.create_task(prefetch(prefetch_client))
+    if warming is not None:
+        try:
+            await warming
+        except Exception as e:
+            print(f"\n⚠️ Prefetch failed: {e!r}")
+
+if __name__ == '__main__':
+    # Before any worker thread exists, so all of them inherit the affinity
+    if PIN_CPUS:
+        _pin_cpus(PIN_CPUS)
+    
+    use_cache = '--no-cache' not in sys.argv
+    if use_cache:
+        semantic_cache = SemanticCache(threshold=0.92, path=SEMANTIC_CACHE_PATH)
+    
+    asyncio.run(main(use_cache, batch='--batch' in sys.argv, stream='--stream' in sys.argv,
+                     prefetch_next='--prefetch' in sys.argv))
+    
+    print(f"\nCache: {stats['hits']} hits, {stats['misses']} misses")
+    if semantic_cache is not None:
+        semantic_cache.save()
@@ -0,0 +1,79 @@
+"""Tests for LLMClientPool client selection."""
+import time
+
+import orjson
+
+from llm_pool import LLMClientPool
+
+
+class _StubClient:
+    def __init__(self, model, succeed=True):
+        self.model = model
+        self.succeed = succeed
+        self.calls = 0
+
+    def is_available(self):
+        return True
+
+    def generate(self, prompt, options=None, json_mode=True):
+        self.calls += 1
+        return {'response': 'ok', 'generation_time': 0.0, 'model': self.model,
+                'success': self.succeed, 'error': None if self.succeed else 'boom'}
+
+    def generate_stream(self, prompt, options=None, json_mode=True):
+        self.calls += 1
+        if not self.succeed:
+            orjson.loads(b'{"response": ')  # Malformed chunk
+        yield 'ok'
+
+
+class GroqClient(_StubClient):
+    pass
+
+
+class OllamaClient(_StubClient):
+    pass
+
+
+def _tripped_pool(reset_after):
+    groq, ollama = GroqClient('groq'), OllamaClient('ollama')
+    pool = LLMClientPool([groq, ollama], fail_threshold=1, reset_after=reset_after)
+    pool.breakers[0].record_failure()
+    return pool, groq, ollama
+
+
+def test_restricted_generate_probes_half_open_client():
+    pool, groq, ollama = _tripped_pool(reset_after=0.01)
+    time.sleep(0.02)  # Past the cooldown: the breaker is half-open
+
+    result = pool.generate('prompt', clients=[groq])
+
+    assert result['model'] == 'groq' and result['success']
+    assert (groq.calls, ollama.calls) == (1, 0)
+    assert not pool.breakers[0].is_open()
+
+
+def test_restricted_generate_never_falls_back_while_open():
+    pool, groq, ollama = _tripped_pool(reset_after=60)
+
+    result = pool.generate('prompt', clients=[groq])
+
+    assert not result['success']
+    assert (groq.calls, ollama.calls) == (0, 0)
+
+
+def test_unrestricted_generate_falls_back_while_open():
+    pool, groq, ollama = _tripped_pool(reset_after=60)
+
+    assert pool.generate('prompt')['model'] == 'ollama'
+    assert (groq.calls, ollama.calls) == (0, 1)
+
+
+def test_stream_falls_back_on_malformed_chunk():
+    groq, ollama = GroqClient('groq', succeed=False), OllamaClient('ollama')
+    pool = LLMClientPool([groq, ollama], fail_threshold=1, reset_after=60)
+    stream_info = {}
+
+    assert list(pool.generate_stream('prompt', stream_info=stream_info)) == ['ok']
+    assert stream_info['model'] == 'ollama'
+    assert pool.breakers[0].is_open()
@@ -0,0 +1,61 @@
+"""Regression tests for SemanticCache matching."""
+import pytest
+
+from semantic_cache import SemanticCache
+
+# Long enough to outweigh a short subject name if it were part of the embedding
+PROGRAM = "B.Tech Computer Science and Engineering with Specialization in Artificial Intelligence"
+
+
+@pytest.mark.parametrize("cached, requested", [
+    ("Physics", "Ethics"),
+    ("Physics", "Physics Lab"),
+    ("Physics", "Engineering Physics"),
+    ("Physics", "Applied Physics"),
+    ("Operating Systems", "Operating Systems Lab"),
+    ("Data Mining", "Text Mining"),
+    ("Web Development", "Mobile Development"),
+    ("Machine Learning", "Deep Learning"),
+    ("Artificial Intelligence", "AI Ethics"),
+])
+def test_distinct_subjects_in_same_program_miss(cached, requested):
+    cache = SemanticCache(threshold=0.92)
+    cache.put(cached, "syllabus", scope=PROGRAM)
+    assert cache.get(requested, scope=PROGRAM) is None
+
+
+@pytest.mark.parametrize("cached, requested", [
+    ("Introduction to Machine Learning", "Intro to ML"),
+    ("Data Structures and Algorithms", "Data Structures & Algorithms"),
+    ("Database Management Systems", "DBMS"),
+    ("Object Oriented Programming", "OOPs"),
+])
+def test_near_duplicate_subjects_hit(cached, requested):
+    cache = SemanticCache(threshold=0.92)
+    cache.put(cached, "syllabus", scope=PROGRAM)
+    assert cache.get(requested, scope=PROGRAM) == "syllabus"
+
+
+def test_scope_must_match():
+    cache = SemanticCache(threshold=0.92)
+    cache.put("Physics", "syllabus", scope=PROGRAM)
+    assert cache.get("Physics", scope="MBA") is None
+    assert cache.get("Physics", scope=PROGRAM.upper()) == "syllabus"
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "semantic.json")
+    cache = SemanticCache(threshold=0.92, path=path)
+    cache.put("Calculus II", {"response": "syllabus", "success": True}, scope=PROGRAM)
+    cache.save()
+
+    reloaded = SemanticCache(threshold=0.92, path=path)
+    assert len(reloaded) == 1
+    assert reloaded.get("Calculus II", scope=PROGRAM) == {"response": "syllabus", "success": True}
+    assert reloaded.get("Calculus I", scope=PROGRAM) is None
+
+
+def test_load_ignores_unreadable_file(tmp_path):
+    path = tmp_path / "semantic.json"
+    path.write_bytes(b"\x80\x04not json")
+    assert len(SemanticCache(path=str(path))) == 0